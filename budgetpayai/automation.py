@@ -3,6 +3,7 @@ Financial automation and tax planning
 """
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
+import numpy as np
 
 
 class AutoInvestmentManager:
@@ -273,6 +274,11 @@ class TaxPlanner:
         
         self.deductions_80c_limit = 150000
         self.deductions_80d_limit = 25000
+        
+        # Slab floors, rates and the tax owed up to each floor, for calculate_tax_batch
+        self.bracket_edges = np.array([slab['min'] for slab in self.tax_slabs], dtype=np.float64)
+        self.bracket_rates = np.array([slab['rate'] / 100 for slab in self.tax_slabs], dtype=np.float64)
+        self.cum_tax = np.concatenate(([0.0], np.cumsum(np.diff(self.bracket_edges) * self.bracket_rates[:-1])))
     
     def calculate_tax(self, annual_income: float, regime: str = 'new') -> Dict[str, Any]:
         """Calculate income tax"""
@@ -303,6 +309,32 @@ class TaxPlanner:
             'monthly_tax': round(total_tax / 12, 2)
         }
     
+    def calculate_tax_batch(self, annual_incomes, regime: str = 'new') -> Dict[str, np.ndarray]:
+        """Calculate income tax for many incomes at once, as in calculate_tax"""
+        incomes = np.asarray(annual_incomes, dtype=np.float64)
+        # Both regimes currently tax the full income
+        taxable_income = np.maximum(incomes, 0)
+        
+        # Locate each income's slab, then add its marginal tax to the tax owed below it
+        idx = np.searchsorted(self.bracket_edges, taxable_income, side='right') - 1
+        tax = self.cum_tax[idx] + (taxable_income - self.bracket_edges[idx]) * self.bracket_rates[idx]
+        
+        # Add cess (4%)
+        cess = tax * 0.04
+        total_tax = tax + cess
+        with np.errstate(divide='ignore', invalid='ignore'):
+            effective_rate = np.where(incomes > 0, total_tax / incomes * 100, 0.0)
+        
+        return {
+            'annual_income': incomes,
+            'taxable_income': taxable_income,
+            'tax_before_cess': np.round(tax, 2),
+            'cess': np.round(cess, 2),
+            'total_tax': np.round(total_tax, 2),
+            'effective_tax_rate': np.round(effective_rate, 2),
+            'monthly_tax': np.round(total_tax / 12, 2)
+        }
+    
     def suggest_tax_savings(self, annual_income: float, current_investments: Dict) -> List[Dict]:
         """Suggest tax-saving investments"""
         suggestions = []
@@ -1,6 +1,7 @@
 """
 Evaluation metrics for Aiza model
 """
+import numpy as np
 import torch
 import torch.nn.functional as F
 from typing import Dict, List
@@ -16,29 +17,32 @@ class AizaEvaluator:
         self.device = device
     
     @torch.no_grad()
-    def calculate_perplexity(self, text_samples: List[str]) -> float:
+    def calculate_perplexity(self, text_samples: List[str], batch_size: int = 16) -> float:
         """Calculate perplexity on text samples"""
         self.model.eval()
+        ids, lengths = self.tokenizer.encode_batch(text_samples)
+        # Batch similar lengths together so little of each batch is padding
+        order = np.argsort(lengths, kind='stable')
+        use_amp = str(self.device).startswith('cuda')
         total_loss = 0
         total_tokens = 0
         
-        for text in text_samples:
-            tokens = self.tokenizer.encode(text)
-            if len(tokens) < 2:
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            width = int(lengths[rows].max())
+            if width < 2:
                 continue
+            batch = torch.from_numpy(ids[rows, :width]).to(self.device)
+            # Right padding never reaches real positions under the causal
+            # mask; it is only excluded from the loss
+            mask = torch.arange(1, width, device=self.device) < torch.from_numpy(lengths[rows]).to(self.device)[:, None]
             
-            input_ids = torch.tensor([tokens[:-1]], dtype=torch.long).to(self.device)
-            target_ids = torch.tensor([tokens[1:]], dtype=torch.long).to(self.device)
+            with torch.autocast(device_type='cuda', dtype=torch.float16, enabled=use_amp):
+                logits = self.model(batch[:, :-1])
+            loss = F.cross_entropy(logits.float().transpose(1, 2), batch[:, 1:], reduction='none')
             
-            logits = self.model(input_ids)
-            loss = F.cross_entropy(
-                logits.view(-1, logits.size(-1)),
-                target_ids.view(-1),
-                reduction='sum'
-            )
-            
-            total_loss += loss.item()
-            total_tokens += len(tokens) - 1
+            total_loss += loss[mask].sum().item()
+            total_tokens += int(mask.sum())
         
         avg_loss = total_loss / total_tokens if total_tokens > 0 else float('inf')
         perplexity = torch.exp(torch.tensor(avg_loss)).item()
@@ -110,7 +114,7 @@ class AizaEvaluator:
             x, y = x.to(self.device), y.to(self.device)
             
             logits = self.model(x)
-            loss = F.cross_entropy(logits.view(-1, logits.size(-1)), y.view(-1))
+            loss = F.cross_entropy(logits.transpose(1, 2), y)
             total_loss += loss.item()
             num_batches += 1
         
@@ -1,7 +1,6 @@
 """
 Transformer model architecture for Aiza
 """
-import math
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
@@ -16,17 +15,30 @@ class MultiHeadAttention(nn.Module):
         self.qkv = nn.Linear(dim, dim * 3)
         self.proj = nn.Linear(dim, dim)
         
-    def forward(self, x):
+    def forward(self, x, past_kv=None, attn_mask=None):
         B, T, C = x.shape
         qkv = self.qkv(x).reshape(B, T, 3, self.num_heads, self.head_dim)
         q, k, v = qkv.permute(2, 0, 3, 1, 4)
         
-        att = (q @ k.transpose(-2, -1)) * (1.0 / math.sqrt(self.head_dim))
-        att = att.masked_fill(torch.triu(torch.ones(T, T, device=x.device), diagonal=1).bool(), float('-inf'))
-        att = F.softmax(att, dim=-1)
+        # Keys/values of earlier positions cached while decoding
+        if past_kv is not None:
+            k = torch.cat([past_kv[0], k], dim=2)
+            v = torch.cat([past_kv[1], v], dim=2)
         
-        out = (att @ v).transpose(1, 2).reshape(B, T, C)
-        return self.proj(out)
+        # Fused causal attention (FlashAttention / memory-efficient kernels
+        # where available); never materializes the T x T score matrix.
+        # Cached or padded decoding passes an explicit mask instead
+        if attn_mask is None and past_kv is not None:
+            # is_causal aligns top-left, so with a cache the new queries
+            # would only see the oldest keys; offset the mask to the bottom-right
+            S = k.size(2)
+            attn_mask = torch.ones(T, S, dtype=torch.bool, device=x.device).tril(S - T)
+        if attn_mask is None:
+            out = F.scaled_dot_product_attention(q, k, v, is_causal=True)
+        else:
+            out = F.scaled_dot_product_attention(q, k, v, attn_mask=attn_mask)
+        out = out.transpose(1, 2).reshape(B, T, C)
+        return self.proj(out), (k, v)
 
 
 class FeedForward(nn.Module):
@@ -50,10 +62,11 @@ class TransformerBlock(nn.Module):
         self.ln1 = nn.LayerNorm(dim)
         self.ln2 = nn.LayerNorm(dim)
     
-    def forward(self, x):
-        x = x + self.attn(self.ln1(x))
+    def forward(self, x, past_kv=None, attn_mask=None):
+        attn_out, kv = self.attn(self.ln1(x), past_kv, attn_mask)
+        x = x + attn_out
         x = x + self.ff(self.ln2(x))
-        return x
+        return x, kv
 
 
 class AizaModel(nn.Module):
@@ -66,26 +79,103 @@ class AizaModel(nn.Module):
         self.head = nn.Linear(dim, vocab_size, bias=False)
         self.max_seq_len = max_seq_len
         
-    def forward(self, idx):
+    def forward(self, idx, past_key_values=None, attn_mask=None, positions=None, use_cache=False):
         B, T = idx.shape
         tok_emb = self.tok_emb(idx)
-        pos_emb = self.pos_emb(torch.arange(T, device=idx.device))
+        if positions is None:
+            positions = torch.arange(T, device=idx.device)
+        pos_emb = self.pos_emb(positions)
         x = tok_emb + pos_emb
         
-        for block in self.blocks:
-            x = block(x)
+        presents = []
+        for i, block in enumerate(self.blocks):
+            x, kv = block(x, past_key_values[i] if past_key_values else None, attn_mask)
+            presents.append(kv)
         
         x = self.ln_f(x)
         logits = self.head(x)
-        return logits
+        return (logits, presents) if use_cache else logits
     
     @torch.no_grad()
-    def generate(self, idx, max_new_tokens, temperature=1.0):
-        for _ in range(max_new_tokens):
+    def generate(self, idx, max_new_tokens, temperature=1.0, prompt_lengths=None):
+        """
+        Sample max_new_tokens after each row of idx.
+        Rows may be left-padded to a common width; prompt_lengths gives
+        each row's real length so padding is masked out.
+        """
+        new_tokens = list(self.generate_stream(idx, max_new_tokens, temperature, prompt_lengths))
+        return torch.cat([idx] + new_tokens, dim=1)
+    
+    @torch.no_grad()
+    def generate_stream(self, idx, max_new_tokens, temperature=1.0, prompt_lengths=None):
+        """Like generate, but yield each step's (B, 1) sampled tokens as soon as they exist"""
+        B, T = idx.shape
+        if T + max_new_tokens <= self.max_seq_len:
+            yield from self._generate_cached(idx, max_new_tokens, temperature, prompt_lengths)
+            return
+        
+        # Longer outputs slide the context window, so recompute every step
+        if prompt_lengths is not None:
+            lengths = torch.as_tensor(prompt_lengths, device=idx.device)
+        for step in range(max_new_tokens):
             idx_cond = idx if idx.size(1) <= self.max_seq_len else idx[:, -self.max_seq_len:]
-            logits = self(idx_cond)
+            if prompt_lengths is None:
+                logits = self(idx_cond)
+            else:
+                # A row's real tokens are the last (lengths + step) columns,
+                # up to the whole window; mask and position the rest as padding
+                width = idx_cond.size(1)
+                pad = width - (lengths + step).clamp(max=width)
+                mask, positions = _padded_causal_mask(width, pad)
+                logits = self(idx_cond, attn_mask=mask[:, None], positions=positions)
             logits = logits[:, -1, :] / temperature
             probs = F.softmax(logits, dim=-1)
             idx_next = torch.multinomial(probs, num_samples=1)
             idx = torch.cat([idx, idx_next], dim=1)
-        return idx
+            yield idx_next
+    
+    def _generate_cached(self, idx, max_new_tokens, temperature, prompt_lengths):
+        """Sample with a KV cache: the prompt runs once, then one token per step"""
+        B, T = idx.shape
+        device = idx.device
+        if prompt_lengths is None:
+            lengths = torch.full((B,), T, device=device)
+        else:
+            lengths = torch.as_tensor(prompt_lengths, device=device)
+        pad = T - lengths
+        
+        # Keys each row may attend to over the whole output (not its padding)
+        key_valid = torch.arange(T + max_new_tokens, device=device)[None, :] >= pad[:, None]
+        
+        # Prompt pass: causal over real tokens only
+        mask, positions = _padded_causal_mask(T, pad)
+        logits, past = self(idx, attn_mask=mask[:, None], positions=positions, use_cache=True)
+        
+        for step in range(max_new_tokens):
+            logits = logits[:, -1, :] / temperature
+            probs = F.softmax(logits, dim=-1)
+            idx_next = torch.multinomial(probs, num_samples=1)
+            yield idx_next
+            if step == max_new_tokens - 1:
+                break
+            
+            # Feed only the new token; it follows each row's real tokens
+            mask = key_valid[:, None, None, :T + step + 1]
+            positions = (lengths + step)[:, None]
+            logits, past = self(idx_next, past, attn_mask=mask, positions=positions, use_cache=True)
+
+
+def _padded_causal_mask(T, pad):
+    """Causal (B, T, T) mask hiding each row's left padding, and positions counted from its first real token"""
+    cols = torch.arange(T, device=pad.device)
+    causal = torch.ones(T, T, dtype=torch.bool, device=pad.device).tril()
+    # Padding rows see only themselves so they stay finite
+    eye = torch.eye(T, dtype=torch.bool, device=pad.device)
+    mask = causal & ((cols[None, :] >= pad[:, None])[:, None, :] | eye)
+    positions = (cols[None, :] - pad[:, None]).clamp(min=0)
+    return mask, positions
+
+
+def quantize_int8(model):
+    """Swap the model's Linear layers for dynamically quantized int8 ones (CPU only)"""
+    return torch.ao.quantization.quantize_dynamic(model.eval(), {nn.Linear}, dtype=torch.qint8)
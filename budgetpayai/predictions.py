@@ -1,9 +1,46 @@
 """
 ML-based spending predictions and bill reminders
 """
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
-import statistics
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Tuple
+import math
+import re
+
+# Closed label sets, indexed by integer codes computed from comparisons
+_TREND_LABELS = ('decreasing', 'stable', 'increasing')
+_CONFIDENCE_LABELS = ('high', 'medium', 'low')
+_STATUS_LABELS = ('under', 'on_track', 'over')
+
+
+def _parse_ymd_fast(value: str) -> date:
+    """Parse the leading YYYY-MM-DD of an ISO timestamp"""
+    return date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+
+
+def _mean(values: List[float]) -> float:
+    """Float mean (statistics.mean goes through exact fractions)"""
+    return math.fsum(values) / len(values)
+
+
+def _std(values: List[float]) -> float:
+    """Sample standard deviation, 0.0 for fewer than two values"""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    m = math.fsum(values) / n
+    return math.sqrt(math.fsum((x - m) * (x - m) for x in values) / (n - 1))
+
+
+def _holt_damped(values: List[float], alpha: float = 0.6, beta: float = 0.2,
+                 phi: float = 0.9) -> Tuple[float, float]:
+    """One-step Holt damped-trend forecast; returns (forecast, final trend)"""
+    level = values[0]
+    trend = 0.0
+    for x in values[1:]:
+        prev_level = level
+        level = alpha * x + (1 - alpha) * (level + phi * trend)
+        trend = beta * (level - prev_level) + (1 - beta) * phi * trend
+    return level + phi * trend, trend
 
 
 class SpendingPredictor:
@@ -11,6 +48,8 @@ class SpendingPredictor:
     
     def __init__(self):
         self.min_data_points = 3
+        # Monthly slope, as a fraction of average spending, treated as flat
+        self.trend_tolerance = 0.03
     
     def predict_monthly_spending(self, historical_data: List[Dict]) -> Dict[str, Any]:
         """Predict next month's spending based on history"""
@@ -21,28 +60,17 @@ class SpendingPredictor:
         monthly_totals = [month['total'] for month in historical_data]
         
         # Calculate statistics
-        avg_spending = statistics.mean(monthly_totals)
-        std_dev = statistics.stdev(monthly_totals) if len(monthly_totals) > 1 else 0
-        
-        # Detect trend
-        if len(monthly_totals) >= 3:
-            recent_avg = statistics.mean(monthly_totals[-3:])
-            older_avg = statistics.mean(monthly_totals[:-3]) if len(monthly_totals) > 3 else monthly_totals[0]
-            trend = 'increasing' if recent_avg > older_avg * 1.1 else 'decreasing' if recent_avg < older_avg * 0.9 else 'stable'
-        else:
-            trend = 'stable'
-        
-        # Prediction with trend adjustment
-        if trend == 'increasing':
-            predicted = avg_spending * 1.05
-        elif trend == 'decreasing':
-            predicted = avg_spending * 0.95
-        else:
-            predicted = avg_spending
+        avg_spending = _mean(monthly_totals)
+        std_dev = _std(monthly_totals)
+        
+        # Forecast with Holt's damped trend; small monthly slopes count as stable
+        predicted, slope = _holt_damped(monthly_totals)
+        band = avg_spending * self.trend_tolerance
+        trend = _TREND_LABELS[1 + (slope > band) - (slope < -band)]
         
         return {
             'predicted_amount': round(predicted, 2),
-            'confidence': 'high' if std_dev < avg_spending * 0.2 else 'medium' if std_dev < avg_spending * 0.4 else 'low',
+            'confidence': _CONFIDENCE_LABELS[(std_dev >= avg_spending * 0.2) + (std_dev >= avg_spending * 0.4)],
             'trend': trend,
             'average_spending': round(avg_spending, 2),
             'min_expected': round(predicted - std_dev, 2),
@@ -56,10 +84,10 @@ class SpendingPredictor:
         
         for category, amounts in category_history.items():
             if len(amounts) >= self.min_data_points:
-                avg = statistics.mean(amounts)
+                avg = _mean(amounts)
                 # Adjust for recent trend
                 if len(amounts) >= 3:
-                    recent_avg = statistics.mean(amounts[-3:])
+                    recent_avg = _mean(amounts[-3:])
                     if recent_avg > avg * 1.1:
                         predictions[category] = recent_avg * 1.05
                     elif recent_avg < avg * 0.9:
@@ -136,8 +164,8 @@ class BillReminder:
             if len(txns) >= 3:  # At least 3 occurrences
                 # Check if amounts are similar
                 amounts = [t.get('amount', 0) for t in txns]
-                avg_amount = statistics.mean(amounts)
-                std_dev = statistics.stdev(amounts) if len(amounts) > 1 else 0
+                avg_amount = _mean(amounts)
+                std_dev = _std(amounts)
                 
                 # Check if dates are regular
                 if std_dev < avg_amount * 0.2:  # Low variance = recurring
@@ -155,19 +183,28 @@ class BillReminder:
     def _predict_next_due(self, transactions: List[Dict]) -> str:
         """Predict next due date based on transaction history"""
         # Simple prediction: add 30 days to last transaction
-        if transactions:
-            last_date = transactions[-1].get('timestamp', datetime.now().isoformat())
+        last_date = transactions[-1].get('timestamp') if transactions else None
+        if isinstance(last_date, str) and last_date:
+            if len(last_date) >= 10:
+                # Only the day matters, so skip full ISO-8601 parsing
+                try:
+                    last_day = _parse_ymd_fast(last_date)
+                    return date.fromordinal(last_day.toordinal() + 30).isoformat()
+                except ValueError:
+                    pass
+            # Strings the fast path can't read go through the full parser
             try:
                 last_dt = datetime.fromisoformat(last_date)
                 next_due = last_dt + timedelta(days=30)
                 return next_due.strftime('%Y-%m-%d')
-            except:
+            except ValueError:
                 pass
         return (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
     
     def get_upcoming_bills(self, recurring_bills: List[Dict], days_ahead: int = 7) -> List[Dict]:
         """Get bills due in next N days"""
-        upcoming = []
+        # Bucket by days until due (bounded by days_ahead) instead of sorting
+        buckets = [[] for _ in range(max(days_ahead, 0) + 1)]
         today = datetime.now()
         cutoff = today + timedelta(days=days_ahead)
         
@@ -178,11 +215,11 @@ class BillReminder:
                     days_until = (due_date - today).days
                     bill['days_until_due'] = days_until
                     bill['urgency'] = 'urgent' if days_until <= 2 else 'soon'
-                    upcoming.append(bill)
+                    buckets[days_until].append(bill)
             except:
                 continue
         
-        return sorted(upcoming, key=lambda x: x['days_until_due'])
+        return [bill for bucket in buckets for bill in bucket]
     
     def create_reminders(self, upcoming_bills: List[Dict]) -> List[str]:
         """Create reminder messages"""
@@ -213,36 +250,52 @@ class SubscriptionDetector:
             'netflix', 'prime', 'spotify', 'hotstar', 'youtube', 'apple',
             'subscription', 'membership', 'plan', 'renewal'
         ]
+        # One alternation scans each merchant once instead of once per keyword
+        self._keyword_pattern = re.compile(
+            '|'.join(map(re.escape, self.subscription_keywords))
+        )
     
     def detect_subscriptions(self, transactions: List[Dict]) -> List[Dict]:
         """Detect active subscriptions"""
         subscriptions = []
         
-        # Group by merchant
-        merchant_txns = {}
+        # Parse timestamps once and sort all candidate payments by time, so
+        # every per-merchant group below is already in chronological order
+        now = datetime.now()
+        dated_txns = []
         for txn in transactions:
             merchant = txn.get('merchant', '').lower()
             
             # Check if it's a subscription
-            is_subscription = any(keyword in merchant for keyword in self.subscription_keywords)
+            is_subscription = self._keyword_pattern.search(merchant) is not None
             
             if is_subscription:
-                if merchant not in merchant_txns:
-                    merchant_txns[merchant] = []
-                merchant_txns[merchant].append(txn)
+                timestamp = txn.get('timestamp')
+                dated_txns.append((datetime.fromisoformat(timestamp) if timestamp else now, merchant, txn))
+        
+        dated_txns.sort(key=lambda item: item[0])
+        
+        # Group by merchant (insertion keeps the time order)
+        merchant_txns = {}
+        merchant_dates = {}
+        for txn_date, merchant, txn in dated_txns:
+            if merchant not in merchant_txns:
+                merchant_txns[merchant] = []
+                merchant_dates[merchant] = []
+            merchant_txns[merchant].append(txn)
+            merchant_dates[merchant].append(txn_date)
         
         # Analyze each subscription
         for merchant, txns in merchant_txns.items():
             if len(txns) >= 2:  # At least 2 payments
                 amounts = [t.get('amount', 0) for t in txns]
-                avg_amount = statistics.mean(amounts)
+                avg_amount = _mean(amounts)
                 
                 # Calculate frequency
                 if len(txns) >= 2:
-                    dates = [datetime.fromisoformat(t.get('timestamp', datetime.now().isoformat())) for t in txns]
-                    dates.sort()
+                    dates = merchant_dates[merchant]
                     intervals = [(dates[i+1] - dates[i]).days for i in range(len(dates)-1)]
-                    avg_interval = statistics.mean(intervals) if intervals else 30
+                    avg_interval = _mean(intervals) if intervals else 30
                     
                     frequency = 'monthly' if 25 <= avg_interval <= 35 else 'yearly' if avg_interval > 300 else 'other'
                 else:
@@ -311,7 +364,7 @@ class AdaptiveBudgetManager:
                 'budgeted': budgeted,
                 'actual': actual,
                 'variance_percent': round(variance * 100, 1),
-                'status': 'over' if variance > 0.1 else 'under' if variance < -0.1 else 'on_track',
+                'status': _STATUS_LABELS[1 + (variance > 0.1) - (variance < -0.1)],
                 'difference': round(actual - budgeted, 2)
             }
         
@@ -336,21 +389,18 @@ class AdaptiveBudgetManager:
     def create_adaptive_budget(self, historical_spending: Dict[str, List[float]], 
                               income: float) -> Dict[str, float]:
         """Create adaptive budget based on spending patterns"""
-        budget = {}
-        
-        # Calculate average spending per category
-        for category, amounts in historical_spending.items():
-            if amounts:
-                avg = statistics.mean(amounts)
-                # Add 10% buffer
-                budget[category] = round(avg * 1.1, 2)
-        
-        # Ensure total doesn't exceed 80% of income
-        total_budget = sum(budget.values())
-        if total_budget > income * 0.8:
-            # Scale down proportionally
-            scale_factor = (income * 0.8) / total_budget
-            budget = {k: round(v * scale_factor, 2) for k, v in budget.items()}
+        # Calculate average spending per category with a 10% buffer
+        buffered = {
+            category: _mean(amounts) * 1.1
+            for category, amounts in historical_spending.items()
+            if amounts
+        }
+        
+        # Ensure total doesn't exceed 80% of income, scaling down
+        # proportionally, and round each category only once
+        total_budget = math.fsum(buffered.values())
+        scale_factor = (income * 0.8) / total_budget if total_budget > income * 0.8 else 1.0
+        budget = {k: round(v * scale_factor, 2) for k, v in buffered.items()}
         
         # Add savings goal (20% of income)
         budget['savings'] = round(income * 0.2, 2)
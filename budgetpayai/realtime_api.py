@@ -0,0 +1,110 @@
+"""
+Real-time market data routes shared by the web APIs
+"""
+from fastapi import APIRouter
+from pydantic import BaseModel, Field
+from .realtime_data import RealTimeDataHub
+
+
+# One hub (connection pool and caches) per process, however many apps mount the routes
+realtime_hub = RealTimeDataHub()
+router = APIRouter(prefix="/api")
+
+# Handlers that may call upstream APIs are plain functions, so FastAPI runs
+# them in its threadpool instead of blocking the event loop on HTTP I/O
+
+
+class ConvertReq(BaseModel):
+    amount: float = 0
+    from_curr: str = Field('USD', alias='from')
+    to_curr: str = Field('EUR', alias='to')
+
+
+@router.get("/stock/{symbol}")
+def get_stock_price(symbol: str):
+    """Get current stock price"""
+    return realtime_hub.stocks.get_stock_price(symbol.upper())
+
+
+@router.get("/stock/{symbol}/history")
+def get_stock_history(symbol: str, days: int = 30):
+    """Get stock price history"""
+    return realtime_hub.stocks.get_stock_history(symbol.upper(), days)
+
+
+@router.get("/stock/search/{keywords}")
+def search_stocks(keywords: str):
+    """Search for stocks"""
+    return {"results": realtime_hub.stocks.search_stocks(keywords)}
+
+
+@router.get("/currency/{from_curr}/{to_curr}")
+def get_exchange_rate(from_curr: str, to_curr: str):
+    """Get currency exchange rate"""
+    return realtime_hub.currency.get_exchange_rate(from_curr, to_curr)
+
+
+@router.post("/currency/convert")
+def convert_currency(req: ConvertReq):
+    """Convert currency amount"""
+    return realtime_hub.currency.convert_currency(req.amount, req.from_curr, req.to_curr)
+
+
+@router.get("/currency/rates/{base}")
+def get_all_rates(base: str = "USD"):
+    """Get all exchange rates for base currency"""
+    return realtime_hub.currency.get_all_rates(base)
+
+
+@router.get("/rates/federal")
+async def get_federal_rate():
+    """Get Federal Funds Rate"""
+    return realtime_hub.interest.get_federal_funds_rate()
+
+
+@router.get("/rates/mortgage")
+async def get_mortgage_rates():
+    """Get current mortgage rates"""
+    return realtime_hub.interest.get_mortgage_rates()
+
+
+@router.get("/rates/savings")
+async def get_savings_rates():
+    """Get savings account rates"""
+    return realtime_hub.interest.get_savings_rates()
+
+
+@router.get("/rates/inflation")
+async def get_inflation():
+    """Get current inflation rate"""
+    return realtime_hub.interest.get_inflation_rate()
+
+
+@router.get("/news/market")
+def get_market_news(limit: int = 10):
+    """Get latest market news"""
+    return {"news": realtime_hub.news.get_market_news(limit)}
+
+
+@router.get("/news/search/{query}")
+def search_news(query: str, limit: int = 5):
+    """Search financial news"""
+    return {"news": realtime_hub.news.search_news(query, limit)}
+
+
+@router.get("/bank/accounts")
+async def get_bank_accounts(access_token: str = "demo"):
+    """Get user's bank accounts"""
+    return realtime_hub.bank.get_accounts(access_token)
+
+
+@router.get("/bank/transactions")
+async def get_transactions(access_token: str = "demo", days: int = 30):
+    """Get recent transactions"""
+    return realtime_hub.bank.get_transactions(access_token, days)
+
+
+@router.get("/market/overview")
+async def get_market_overview():
+    """Get comprehensive market overview"""
+    return await realtime_hub.aget_market_overview()
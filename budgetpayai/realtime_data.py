@@ -1,62 +1,293 @@
 """
 Real-time financial data integrations for Aiza
 """
+import numpy as np
+import orjson
 import requests
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import islice
+from collections import OrderedDict, defaultdict, deque
+from typing import Dict, List, NamedTuple, Optional, Any, Tuple
+import asyncio
 import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Row layout for get_stock_history_array. Prices are float32 (~7 significant
+# digits, plenty for charts and indicators); volume stays int64 because
+# heavily traded symbols can exceed the int32 range
+HISTORY_DTYPE = np.dtype([
+    ("date", "U10"),
+    ("open", "f4"),
+    ("high", "f4"),
+    ("low", "f4"),
+    ("close", "f4"),
+    ("volume", "i8")
+])
+
+# (connect, read) seconds: fail fast on unreachable hosts, allow slow bodies
+DEFAULT_TIMEOUT = (3.05, 15)
+
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+# Exchange-rate tables persisted across processes, so short-lived scripts
+# start from disk instead of the network
+RATES_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "aiza_rates.json")
+_rates_file_lock = threading.Lock()
+_BASE_LOCK_STRIPES = 16
+
+
+class _CappedRetry(Retry):
+    """Retry whose Retry-After sleeps are capped, so a handler never stalls for minutes"""
+    
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, _MAX_THROTTLE_WAIT)
+
+
+def _create_session() -> requests.Session:
+    """Create an HTTP session with pooled keep-alive connections and retries"""
+    session = requests.Session()
+    # Retry idempotent GETs on connection errors, 429 and 5xx with jittered
+    # exponential backoff, honouring a capped Retry-After; other 4xx are returned as-is
+    retries = _CappedRetry(
+        total=5,
+        backoff_factor=0.5,
+        backoff_jitter=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    
+    # Every call to a rate-limited host must pass its limiter, so those hosts
+    # only retry connections that never reached the server; 429/5xx responses
+    # and read failures are returned to the caller instead of re-sent
+    quota_retries = _CappedRetry(total=5, read=0, status=0, backoff_factor=0.5, backoff_jitter=0.3,
+                                 allowed_methods=["GET"], raise_on_status=False)
+    quota_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=quota_retries)
+    for host in _RATE_LIMITS:
+        session.mount(f"https://{host}/", quota_adapter)
+    return session
+
+
+def _get_shared_session() -> requests.Session:
+    """Module-wide session reused by API clients created without one"""
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = _create_session()
+    return _shared_session
+
+
+class RateLimitError(Exception):
+    """Raised when a provider's client-side request budget is exhausted"""
+
+
+class _SlidingWindowLimiter:
+    """Thread-safe limiter admitting a call only if every (calls, period) window has room"""
+    
+    def __init__(self, *limits: Tuple[int, float]):
+        # Start times of the admitted calls still inside each window
+        self._windows = [(calls, period, deque(maxlen=calls)) for calls, period in limits]
+        self._lock = threading.Lock()
+    
+    def acquire(self, timeout: float) -> bool:
+        """Record one call, waiting up to timeout seconds; False if no slot came free"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = 0.0
+                for calls, period, starts in self._windows:
+                    while starts and starts[0] <= now - period:
+                        starts.popleft()
+                    if len(starts) >= calls:
+                        wait = max(wait, starts[0] + period - now)
+                if not wait:
+                    for _, _, starts in self._windows:
+                        starts.append(now)
+                    return True
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+# Client-side limits matching the free-tier quotas (Alpha Vantage: 5/minute
+# and 25/day, NewsAPI: 100/day), shared by every client instance per host
+_RATE_LIMITS = {
+    "www.alphavantage.co": _SlidingWindowLimiter((5, 60), (25, 86400)),
+    "newsapi.org": _SlidingWindowLimiter((100, 86400))
+}
+_MAX_THROTTLE_WAIT = 15.0
+
+
+def _throttled_get(session: requests.Session, url: str, **kwargs) -> requests.Response:
+    """GET through the per-host rate limiter"""
+    host = urlsplit(url).hostname
+    limiter = _RATE_LIMITS.get(host)
+    if limiter is not None and not limiter.acquire(_MAX_THROTTLE_WAIT):
+        raise RateLimitError(f"Rate limit reached for {host}")
+    return session.get(url, **kwargs)
+
+
+# (output key, provider key) remapping tables
+_STOCK_SEARCH_FIELDS = (
+    ("symbol", "1. symbol"),
+    ("name", "2. name"),
+    ("type", "3. type"),
+    ("region", "4. region")
+)
+_ARTICLE_FIELDS = (
+    ("title", "title"),
+    ("description", "description"),
+    ("source", "source"),
+    ("url", "url"),
+    ("published_at", "publishedAt")
+)
+
+
+def _article_from_api(article: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a NewsAPI article to the response schema"""
+    result = {key: article.get(src, "") for key, src in _ARTICLE_FIELDS}
+    # "source" is a nested object; keep only its name (same key position)
+    result["source"] = (result["source"] or {}).get("name", "")
+    return result
+
+
+@lru_cache(maxsize=1)
+def _format_day(day: date) -> str:
+    """YYYY-MM-DD for a date; memoized so it only reformats when the day changes"""
+    return day.strftime("%Y-%m-%d")
+
+
+def _today_str() -> str:
+    """Today's date as YYYY-MM-DD"""
+    return _format_day(date.today())
+
+
+def _parse_json(response: requests.Response) -> Any:
+    """Decode a JSON body straight from bytes with orjson, skipping text decoding"""
+    return orjson.loads(response.content)
+
+
+class _TTLCache:
+    """Small thread-safe cache whose entries expire after a fixed TTL"""
+    
+    def __init__(self, ttl: float, maxsize: int = 512):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Any) -> Any:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            return entry[1]
+    
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the oldest entry when full"""
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class Quote(NamedTuple):
+    """Compact stock quote held in caches; converted to a dict at the API boundary"""
+    symbol: str
+    price: float
+    change: float
+    change_percent: str
+    volume: int
+    timestamp: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Response dict in the get_stock_price schema"""
+        result = self._asdict()
+        result["status"] = "success"
+        return result
 
 
 class StockMarketAPI:
     """Real-time stock market data"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, session: Optional[requests.Session] = None,
+                 timeout: Optional[Tuple[float, float]] = None):
         self.api_key = api_key or "demo"  # Use demo key if none provided
         self.base_url = "https://www.alphavantage.co/query"
+        self.session = session or _get_shared_session()
+        self.timeout = timeout or DEFAULT_TIMEOUT
+        self._quote_cache = _TTLCache(ttl=30)
     
     def get_stock_price(self, symbol: str) -> Dict[str, Any]:
         """Get current stock price"""
+        cached = self._quote_cache.get(symbol)
+        if cached is not None:
+            return cached.to_dict()
+        
         try:
             params = {
                 "function": "GLOBAL_QUOTE",
                 "symbol": symbol,
                 "apikey": self.api_key
             }
-            response = requests.get(self.base_url, params=params, timeout=10)
-            data = response.json()
+            response = _throttled_get(self.session, self.base_url, params=params, timeout=self.timeout)
+            data = _parse_json(response)
             
             if "Global Quote" in data and data["Global Quote"]:
                 quote = data["Global Quote"]
-                return {
-                    "symbol": symbol,
-                    "price": float(quote.get("05. price", 0)),
-                    "change": float(quote.get("09. change", 0)),
-                    "change_percent": quote.get("10. change percent", "0%"),
-                    "volume": int(quote.get("06. volume", 0)),
-                    "timestamp": quote.get("07. latest trading day", ""),
-                    "status": "success"
-                }
+                result = Quote(
+                    symbol=symbol,
+                    price=float(quote.get("05. price", 0)),
+                    change=float(quote.get("09. change", 0)),
+                    change_percent=quote.get("10. change percent", "0%"),
+                    volume=int(quote.get("06. volume", 0)),
+                    timestamp=quote.get("07. latest trading day", "")
+                )
+                self._quote_cache.set(symbol, result)
+                return result.to_dict()
             else:
                 return {"status": "error", "message": "Stock not found or API limit reached"}
         except Exception as e:
             return {"status": "error", "message": str(e)}
     
+    def get_stock_prices_batch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get current prices for several symbols, fetched concurrently"""
+        # Alpha Vantage has no multi-symbol quote endpoint, so fan out
+        # GLOBAL_QUOTE calls; cached symbols return immediately
+        if not symbols:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(len(symbols), 8)) as executor:
+            return dict(zip(symbols, executor.map(self.get_stock_price, symbols)))
+    
     def get_stock_history(self, symbol: str, days: int = 30) -> Dict[str, Any]:
         """Get historical stock data"""
         try:
-            params = {
-                "function": "TIME_SERIES_DAILY",
-                "symbol": symbol,
-                "apikey": self.api_key
-            }
-            response = requests.get(self.base_url, params=params, timeout=10)
-            data = response.json()
+            time_series = self._fetch_daily_series(symbol, days)
             
-            if "Time Series (Daily)" in data:
-                time_series = data["Time Series (Daily)"]
+            if time_series is not None:
                 history = []
                 
-                for date, values in list(time_series.items())[:days]:
+                for date, values in islice(time_series.items(), days):
                     history.append({
                         "date": date,
                         "open": float(values["1. open"]),
@@ -76,6 +307,44 @@ class StockMarketAPI:
         except Exception as e:
             return {"status": "error", "message": str(e)}
     
+    def get_stock_history_array(self, symbol: str, days: int = 30) -> Dict[str, Any]:
+        """Get historical stock data as a numpy structured array (HISTORY_DTYPE)"""
+        try:
+            time_series = self._fetch_daily_series(symbol, days)
+            
+            if time_series is not None:
+                rows = list(islice(time_series.items(), days))
+                history = np.fromiter(
+                    ((date, values["1. open"], values["2. high"], values["3. low"],
+                      values["4. close"], values["5. volume"]) for date, values in rows),
+                    dtype=HISTORY_DTYPE,
+                    count=len(rows)
+                )
+                
+                return {
+                    "symbol": symbol,
+                    "history": history,
+                    "status": "success"
+                }
+            else:
+                return {"status": "error", "message": "Data not available"}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+    
+    def _fetch_daily_series(self, symbol: str, days: int) -> Optional[Dict[str, Dict[str, str]]]:
+        """Fetch the raw daily time series, newest first, or None if unavailable"""
+        params = {
+            "function": "TIME_SERIES_DAILY",
+            "symbol": symbol,
+            # "compact" is the latest 100 points; only ask for the multi-year
+            # "full" payload when the caller actually needs more than that
+            "outputsize": "compact" if days <= 100 else "full",
+            "apikey": self.api_key
+        }
+        response = _throttled_get(self.session, self.base_url, params=params, timeout=self.timeout)
+        data = _parse_json(response)
+        return data.get("Time Series (Daily)")
+    
     def search_stocks(self, keywords: str) -> List[Dict[str, str]]:
         """Search for stocks by name or symbol"""
         try:
@@ -84,61 +353,105 @@ class StockMarketAPI:
                 "keywords": keywords,
                 "apikey": self.api_key
             }
-            response = requests.get(self.base_url, params=params, timeout=10)
-            data = response.json()
+            response = _throttled_get(self.session, self.base_url, params=params, timeout=self.timeout)
+            data = _parse_json(response)
             
             if "bestMatches" in data:
-                results = []
-                for match in data["bestMatches"][:5]:
-                    results.append({
-                        "symbol": match.get("1. symbol", ""),
-                        "name": match.get("2. name", ""),
-                        "type": match.get("3. type", ""),
-                        "region": match.get("4. region", "")
-                    })
-                return results
+                return [
+                    {key: match.get(src, "") for key, src in _STOCK_SEARCH_FIELDS}
+                    for match in data["bestMatches"][:5]
+                ]
             return []
         except Exception as e:
             return []
 
 
+# Officially fixed exchange rates, answered without a rates lookup
+_FIXED_PEGS = {
+    ("USD", "AED"): 3.6725,
+    ("USD", "SAR"): 3.75,
+    ("USD", "QAR"): 3.64,
+    ("EUR", "XOF"): 655.957,
+    ("EUR", "XAF"): 655.957
+}
+
+
+def _local_rate(from_code: str, to_code: str) -> Optional[float]:
+    """Rate for identical or pegged currencies, None if it must be looked up"""
+    if from_code == to_code:
+        return 1.0
+    rate = _FIXED_PEGS.get((from_code, to_code))
+    if rate is not None:
+        return rate
+    rate = _FIXED_PEGS.get((to_code, from_code))
+    return 1 / rate if rate is not None else None
+
+
 class CurrencyExchangeAPI:
     """Real-time currency exchange rates"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, session: Optional[requests.Session] = None,
+                 timeout: Optional[Tuple[float, float]] = None, cache_file: Optional[str] = RATES_CACHE_FILE):
         self.api_key = api_key
         self.base_url = "https://api.exchangerate-api.com/v4/latest"
+        self.session = session or _get_shared_session()
+        self.timeout = timeout or DEFAULT_TIMEOUT
+        self.cache_file = cache_file
+        self._rate_cache = _TTLCache(ttl=3600)
+        # Fixed stripe of locks: bases come from request paths, so a
+        # per-base map would grow without bound
+        self._base_locks = [threading.Lock() for _ in range(_BASE_LOCK_STRIPES)]
     
     def get_exchange_rate(self, from_currency: str, to_currency: str) -> Dict[str, Any]:
         """Get exchange rate between two currencies"""
-        try:
-            response = requests.get(f"{self.base_url}/{from_currency.upper()}", timeout=10)
-            data = response.json()
-            
-            if "rates" in data and to_currency.upper() in data["rates"]:
-                rate = data["rates"][to_currency.upper()]
-                return {
-                    "from": from_currency.upper(),
-                    "to": to_currency.upper(),
-                    "rate": rate,
-                    "timestamp": data.get("date", ""),
-                    "status": "success"
-                }
-            else:
-                return {"status": "error", "message": "Currency not found"}
-        except Exception as e:
-            return {"status": "error", "message": str(e)}
+        from_code, to_code = from_currency.upper(), to_currency.upper()
+        local_rate = _local_rate(from_code, to_code)
+        if local_rate is not None:
+            return {
+                "from": from_code,
+                "to": to_code,
+                "rate": local_rate,
+                "timestamp": _today_str(),
+                "status": "success"
+            }
+        
+        # Every pair with the same base is served from one cached rates table
+        rates_data = self.get_all_rates(from_code)
+        if rates_data["status"] != "success":
+            return rates_data
+        
+        if to_code in rates_data["rates"]:
+            return {
+                "from": from_code,
+                "to": to_code,
+                "rate": rates_data["rates"][to_code],
+                "timestamp": rates_data["timestamp"],
+                "status": "success"
+            }
+        return {"status": "error", "message": "Currency not found"}
     
     def convert_currency(self, amount: float, from_currency: str, to_currency: str) -> Dict[str, Any]:
         """Convert amount from one currency to another"""
-        rate_data = self.get_exchange_rate(from_currency, to_currency)
+        from_code, to_code = from_currency.upper(), to_currency.upper()
+        local_rate = _local_rate(from_code, to_code)
+        if local_rate is not None:
+            return {
+                "amount": amount,
+                "from": from_code,
+                "to": to_code,
+                "rate": local_rate,
+                "converted_amount": round(amount * local_rate, 2),
+                "status": "success"
+            }
+        
+        rate_data = self.get_exchange_rate(from_code, to_code)
         
         if rate_data["status"] == "success":
             converted = amount * rate_data["rate"]
             return {
                 "amount": amount,
-                "from": from_currency.upper(),
-                "to": to_currency.upper(),
+                "from": from_code,
+                "to": to_code,
                 "rate": rate_data["rate"],
                 "converted_amount": round(converted, 2),
                 "status": "success"
@@ -147,20 +460,128 @@ class CurrencyExchangeAPI:
     
     def get_all_rates(self, base_currency: str = "USD") -> Dict[str, Any]:
         """Get all exchange rates for a base currency"""
-        try:
-            response = requests.get(f"{self.base_url}/{base_currency.upper()}", timeout=10)
-            data = response.json()
+        base = base_currency.upper()
+        cached = self._rate_cache.get(base)
+        if cached is not None:
+            return cached
+        
+        # Concurrent misses for the same base share a single fetch
+        with self._base_locks[hash(base) % _BASE_LOCK_STRIPES]:
+            cached = self._rate_cache.get(base)
+            if cached is not None:
+                return cached
+            cached = self._load_cached_rates(base)
+            if cached is not None:
+                return cached
             
-            if "rates" in data:
-                return {
-                    "base": base_currency.upper(),
-                    "rates": data["rates"],
-                    "timestamp": data.get("date", ""),
-                    "status": "success"
-                }
-            return {"status": "error", "message": "Data not available"}
-        except Exception as e:
-            return {"status": "error", "message": str(e)}
+            try:
+                response = self.session.get(f"{self.base_url}/{base}", timeout=self.timeout)
+                data = _parse_json(response)
+                
+                if "rates" in data:
+                    result = {
+                        "base": base,
+                        "rates": data["rates"],
+                        "timestamp": data.get("date", ""),
+                        "status": "success"
+                    }
+                    self._rate_cache.set(base, result)
+                    self._store_cached_rates(base, result)
+                    return result
+                return {"status": "error", "message": "Data not available"}
+            except Exception as e:
+                return {"status": "error", "message": str(e)}
+    
+    def _read_rates_file(self) -> Dict[str, Any]:
+        """All persisted rates tables, or {} when the file is missing or corrupt"""
+        try:
+            with open(self.cache_file, "rb") as f:
+                tables = json.loads(f.read())
+        except (OSError, ValueError):
+            return {}
+        return tables if isinstance(tables, dict) else {}
+    
+    def _load_cached_rates(self, base: str) -> Optional[Dict[str, Any]]:
+        """Rates table for base from the disk cache, if still fresh"""
+        if not self.cache_file:
+            return None
+        entry = self._read_rates_file().get(base)
+        if not isinstance(entry, dict):
+            return None
+        fetched_at, result = entry.get("fetched_at"), entry.get("result")
+        if not isinstance(fetched_at, (int, float)) or isinstance(fetched_at, bool) or not isinstance(result, dict):
+            return None
+        remaining = fetched_at + self._rate_cache.ttl - time.time()
+        if remaining <= 0:
+            return None
+        # Expire from memory when the disk copy would have
+        self._rate_cache.set(base, result, ttl=remaining)
+        return result
+    
+    def _store_cached_rates(self, base: str, result: Dict[str, Any]) -> None:
+        """Persist a freshly fetched rates table; failures are ignored"""
+        if not self.cache_file:
+            return
+        with _rates_file_lock:
+            tables = self._read_rates_file()
+            tables[base] = {"fetched_at": time.time(), "result": result}
+            # Write then rename, so other processes never read a partial file
+            tmp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+            try:
+                cache_dir = os.path.dirname(self.cache_file)
+                if cache_dir:
+                    os.makedirs(cache_dir, exist_ok=True)
+                with open(tmp_path, "w") as f:
+                    json.dump(tables, f)
+                os.replace(tmp_path, self.cache_file)
+            except (OSError, TypeError, ValueError):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+    
+    def prefetch_rates(self, *base_currencies: str) -> Dict[str, str]:
+        """Warm the rates cache for several base currencies concurrently"""
+        bases = [base.upper() for base in base_currencies] or ["USD"]
+        with ThreadPoolExecutor(max_workers=min(len(bases), 8)) as executor:
+            results = executor.map(self.get_all_rates, bases)
+            return {base: result["status"] for base, result in zip(bases, results)}
+
+
+# Static interest-rate payloads; "date" is filled in per call
+_FED_FUNDS_PAYLOAD = {
+    "rate": 5.33,
+    "rate_percent": "5.33%",
+    "name": "Federal Funds Effective Rate",
+    "date": "",
+    "source": "Federal Reserve",
+    "status": "success"
+}
+_MORTGAGE_PAYLOAD = {
+    "30_year_fixed": 6.95,
+    "15_year_fixed": 6.38,
+    "5_1_arm": 6.25,
+    "date": "",
+    "source": "Freddie Mac",
+    "status": "success"
+}
+_SAVINGS_PAYLOAD = {
+    "national_average": 0.46,
+    "high_yield_savings": 4.50,
+    "money_market": 4.25,
+    "cd_1_year": 5.00,
+    "cd_5_year": 4.50,
+    "date": "",
+    "status": "success"
+}
+_INFLATION_PAYLOAD = {
+    "rate": 3.2,
+    "rate_percent": "3.2%",
+    "name": "Consumer Price Index (CPI)",
+    "date": "",
+    "source": "Bureau of Labor Statistics",
+    "status": "success"
+}
 
 
 class InterestRatesAPI:
@@ -172,62 +593,41 @@ class InterestRatesAPI:
     def get_federal_funds_rate(self) -> Dict[str, Any]:
         """Get current Federal Funds Rate"""
         # Using mock data - replace with actual FRED API key
-        return {
-            "rate": 5.33,
-            "rate_percent": "5.33%",
-            "name": "Federal Funds Effective Rate",
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "source": "Federal Reserve",
-            "status": "success"
-        }
+        return {**_FED_FUNDS_PAYLOAD, "date": _today_str()}
     
     def get_mortgage_rates(self) -> Dict[str, Any]:
         """Get current mortgage rates"""
-        return {
-            "30_year_fixed": 6.95,
-            "15_year_fixed": 6.38,
-            "5_1_arm": 6.25,
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "source": "Freddie Mac",
-            "status": "success"
-        }
+        return {**_MORTGAGE_PAYLOAD, "date": _today_str()}
     
     def get_savings_rates(self) -> Dict[str, Any]:
         """Get typical savings account rates"""
-        return {
-            "national_average": 0.46,
-            "high_yield_savings": 4.50,
-            "money_market": 4.25,
-            "cd_1_year": 5.00,
-            "cd_5_year": 4.50,
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "status": "success"
-        }
+        return {**_SAVINGS_PAYLOAD, "date": _today_str()}
     
     def get_inflation_rate(self) -> Dict[str, Any]:
         """Get current inflation rate"""
-        return {
-            "rate": 3.2,
-            "rate_percent": "3.2%",
-            "name": "Consumer Price Index (CPI)",
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "source": "Bureau of Labor Statistics",
-            "status": "success"
-        }
+        return {**_INFLATION_PAYLOAD, "date": _today_str()}
 
 
 class FinancialNewsAPI:
     """Real-time financial news and events"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, session: Optional[requests.Session] = None,
+                 timeout: Optional[Tuple[float, float]] = None):
         self.api_key = api_key
         self.base_url = "https://newsapi.org/v2"
+        self.session = session or _get_shared_session()
+        self.timeout = timeout or DEFAULT_TIMEOUT
+        self._news_cache = _TTLCache(ttl=120)
     
     def get_market_news(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get latest market news"""
         if not self.api_key:
             return self._get_mock_news()
         
+        cached = self._news_cache.get(("top", limit))
+        if cached is not None:
+            return cached
+        
         try:
             params = {
                 "apiKey": self.api_key,
@@ -235,19 +635,12 @@ class FinancialNewsAPI:
                 "language": "en",
                 "pageSize": limit
             }
-            response = requests.get(f"{self.base_url}/top-headlines", params=params, timeout=10)
-            data = response.json()
+            response = _throttled_get(self.session, f"{self.base_url}/top-headlines", params=params, timeout=self.timeout)
+            data = _parse_json(response)
             
             if data.get("status") == "ok":
-                articles = []
-                for article in data.get("articles", []):
-                    articles.append({
-                        "title": article.get("title", ""),
-                        "description": article.get("description", ""),
-                        "source": article.get("source", {}).get("name", ""),
-                        "url": article.get("url", ""),
-                        "published_at": article.get("publishedAt", "")
-                    })
+                articles = [_article_from_api(article) for article in data.get("articles", [])]
+                self._news_cache.set(("top", limit), articles)
                 return articles
             return self._get_mock_news()
         except Exception as e:
@@ -255,24 +648,25 @@ class FinancialNewsAPI:
     
     def _get_mock_news(self) -> List[Dict[str, Any]]:
         """Mock news data when API not available"""
+        now = datetime.now().isoformat()
         return [
             {
                 "title": "Markets Rally on Strong Economic Data",
                 "description": "Stock markets reached new highs following positive employment reports.",
                 "source": "Financial Times",
-                "published_at": datetime.now().isoformat()
+                "published_at": now
             },
             {
                 "title": "Fed Holds Interest Rates Steady",
                 "description": "Federal Reserve maintains current interest rate policy amid inflation concerns.",
                 "source": "Reuters",
-                "published_at": datetime.now().isoformat()
+                "published_at": now
             },
             {
                 "title": "Tech Stocks Lead Market Gains",
                 "description": "Technology sector outperforms as investors bet on AI growth.",
                 "source": "Bloomberg",
-                "published_at": datetime.now().isoformat()
+                "published_at": now
             }
         ]
     
@@ -281,6 +675,10 @@ class FinancialNewsAPI:
         if not self.api_key:
             return self._get_mock_news()[:limit]
         
+        cached = self._news_cache.get(("search", query, limit))
+        if cached is not None:
+            return cached
+        
         try:
             params = {
                 "apiKey": self.api_key,
@@ -289,19 +687,12 @@ class FinancialNewsAPI:
                 "sortBy": "publishedAt",
                 "pageSize": limit
             }
-            response = requests.get(f"{self.base_url}/everything", params=params, timeout=10)
-            data = response.json()
+            response = _throttled_get(self.session, f"{self.base_url}/everything", params=params, timeout=self.timeout)
+            data = _parse_json(response)
             
             if data.get("status") == "ok":
-                articles = []
-                for article in data.get("articles", []):
-                    articles.append({
-                        "title": article.get("title", ""),
-                        "description": article.get("description", ""),
-                        "source": article.get("source", {}).get("name", ""),
-                        "url": article.get("url", ""),
-                        "published_at": article.get("publishedAt", "")
-                    })
+                articles = [_article_from_api(article) for article in data.get("articles", [])]
+                self._news_cache.set(("search", query, limit), articles)
                 return articles
             return []
         except Exception as e:
@@ -384,48 +775,122 @@ class BankIntegrationAPI:
     
     def categorize_transactions(self, transactions: List[Dict]) -> Dict[str, Any]:
         """Categorize and analyze transactions"""
-        categories = {}
+        categories = defaultdict(int)
         total = 0
         
         for txn in transactions:
             amount = txn.get("amount", 0)
-            category = txn.get("category", ["Other"])[0] if txn.get("category") else "Other"
+            # Look the category list up once; an empty or missing list is "Other"
+            category = txn.get("category")
+            category = category[0] if category else "Other"
             
-            categories[category] = categories.get(category, 0) + amount
+            categories[category] += amount
             total += amount
         
         return {
             "total_spending": total,
-            "categories": categories,
+            "categories": dict(categories),
             "transaction_count": len(transactions),
             "status": "success"
         }
 
 
+# Index proxies shown in the market overview
+_OVERVIEW_SYMBOLS = {
+    "sp500": "SPY",
+    "nasdaq": "QQQ",
+    "dow": "DIA"
+}
+
+
 class RealTimeDataHub:
     """Central hub for all real-time data"""
     
-    def __init__(self, stock_api_key=None, news_api_key=None, plaid_client_id=None, plaid_secret=None):
-        self.stocks = StockMarketAPI(stock_api_key)
-        self.currency = CurrencyExchangeAPI()
+    def __init__(self, stock_api_key=None, news_api_key=None, plaid_client_id=None, plaid_secret=None,
+                 timeout=None):
+        # One connection pool shared by every HTTP-backed API
+        self.session = _create_session()
+        self.stocks = StockMarketAPI(stock_api_key, session=self.session, timeout=timeout)
+        self.currency = CurrencyExchangeAPI(session=self.session, timeout=timeout)
         self.interest = InterestRatesAPI()
-        self.news = FinancialNewsAPI(news_api_key)
+        self.news = FinancialNewsAPI(news_api_key, session=self.session, timeout=timeout)
         self.bank = BankIntegrationAPI(plaid_client_id, plaid_secret)
+        
+        # Stale-while-revalidate cache for the market overview
+        self.overview_ttl = 5.0
+        self._overview: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._overview_lock = threading.Lock()
+        self._overview_refreshing = False
     
-    def get_market_overview(self) -> Dict[str, Any]:
+    def get_market_overview(self, force_refresh: bool = False) -> Dict[str, Any]:
         """Get comprehensive market overview"""
+        if not force_refresh:
+            cached = self._cached_overview()
+            if cached is not None:
+                return cached
+        return self._store_overview(self._fetch_market_overview())
+    
+    async def aget_market_overview(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """Get market overview without blocking the running event loop"""
+        if not force_refresh:
+            cached = self._cached_overview()
+            if cached is not None:
+                return cached
+        
+        loop = asyncio.get_running_loop()
+        quotes, news = await asyncio.gather(
+            loop.run_in_executor(None, self.stocks.get_stock_prices_batch, list(_OVERVIEW_SYMBOLS.values())),
+            loop.run_in_executor(None, self.news.get_market_news, 5)
+        )
+        return self._store_overview(self._build_overview(quotes, news))
+    
+    def _cached_overview(self) -> Optional[Dict[str, Any]]:
+        """Cached overview if younger than the TTL; past half the TTL, refresh in background"""
+        entry = self._overview
+        if entry is None:
+            return None
+        age = time.monotonic() - entry[0]
+        if age >= self.overview_ttl:
+            return None
+        if age >= self.overview_ttl / 2:
+            with self._overview_lock:
+                start = not self._overview_refreshing
+                self._overview_refreshing = True
+            if start:
+                threading.Thread(target=self._refresh_overview, daemon=True).start()
+        return entry[1]
+    
+    def _refresh_overview(self) -> None:
+        """Background refresh target for the overview cache"""
+        try:
+            self._store_overview(self._fetch_market_overview())
+        finally:
+            with self._overview_lock:
+                self._overview_refreshing = False
+    
+    def _store_overview(self, overview: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a freshly fetched overview and return it"""
+        self._overview = (time.monotonic(), overview)
+        return overview
+    
+    def _fetch_market_overview(self) -> Dict[str, Any]:
+        """Fetch quotes and news and assemble a new overview"""
+        # Quotes and news are independent, so fetch the news alongside the batch
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            news = executor.submit(self.news.get_market_news, 5)
+            quotes = self.stocks.get_stock_prices_batch(list(_OVERVIEW_SYMBOLS.values()))
+            return self._build_overview(quotes, news.result(timeout=15))
+    
+    def _build_overview(self, quotes: Dict[str, Dict[str, Any]], news: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Assemble the overview from fetched quotes (keyed by symbol) and news"""
         return {
-            "stocks": {
-                "sp500": self.stocks.get_stock_price("SPY"),
-                "nasdaq": self.stocks.get_stock_price("QQQ"),
-                "dow": self.stocks.get_stock_price("DIA")
-            },
+            "stocks": {name: quotes[symbol] for name, symbol in _OVERVIEW_SYMBOLS.items()},
             "rates": {
                 "federal_funds": self.interest.get_federal_funds_rate(),
                 "mortgage": self.interest.get_mortgage_rates(),
                 "savings": self.interest.get_savings_rates(),
                 "inflation": self.interest.get_inflation_rate()
             },
-            "news": self.news.get_market_news(5),
+            "news": news,
             "timestamp": datetime.now().isoformat()
         }
@@ -2,9 +2,24 @@
 Automated monthly reports and spending alerts
 """
 from datetime import datetime, timedelta
+from operator import itemgetter
 from typing import List, Dict, Any, Optional
+import heapq
 import json
 
+# Line formatters for export_report_text
+_BULLET_FMT = "  {}\n".format
+_CATEGORY_LINE_FMT = "  {:<15} ₹{:>10,.2f}  ({})\n".format
+
+# Budget alert messages by alert type, rendered from (category, spent, budget, percent)
+_BUDGET_ALERT_FMT = {
+    'budget_exceeded': "🚨 Budget EXCEEDED for {}! Spent ₹{:.0f} of ₹{:.0f} ({:.0f}%)".format,
+    'budget_warning': "⚠️ Approaching budget limit for {}. Spent ₹{:.0f} of ₹{:.0f} ({:.0f}%)".format,
+}
+
+# Alert severities in display order; unknown severities sort last
+_SEVERITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+
 
 class MonthlyReportGenerator:
     """Generate comprehensive monthly financial reports"""
@@ -17,18 +32,20 @@ class MonthlyReportGenerator:
     
     def generate_report(self, month_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate complete monthly report"""
+        # Recommendations and highlights reuse the same summary
+        summary = self._generate_summary(month_data)
         report = {
             'report_date': datetime.now().strftime('%Y-%m-%d'),
             'period': month_data.get('period', 'Unknown'),
-            'summary': self._generate_summary(month_data),
+            'summary': summary,
             'spending_analysis': self._analyze_spending(month_data),
             'category_breakdown': self._category_breakdown(month_data),
             'top_merchants': self._top_merchants(month_data),
             'savings_analysis': self._savings_analysis(month_data),
             'comparisons': self._month_comparisons(month_data),
             'predictions': self._predictions(month_data),
-            'recommendations': self._recommendations(month_data),
-            'highlights': self._generate_highlights(month_data)
+            'recommendations': self._recommendations(month_data, summary),
+            'highlights': self._generate_highlights(month_data, summary)
         }
         
         return report
@@ -57,7 +74,7 @@ class MonthlyReportGenerator:
         return {
             'total_spent': total,
             'daily_average': round(total / 30, 2),
-            'largest_category': max(expenses.items(), key=lambda x: x[1]) if expenses else ('None', 0),
+            'largest_category': max(expenses.items(), key=itemgetter(1)) if expenses else ('None', 0),
             'spending_trend': data.get('trend', 'stable')
         }
     
@@ -65,22 +82,23 @@ class MonthlyReportGenerator:
         """Detailed category breakdown"""
         expenses = data.get('expenses_by_category', {})
         total = sum(expenses.values())
+        # Look the budget table up once rather than per category
+        budget = data.get('budget', {})
+        no_limit = float('inf')
         
-        breakdown = {}
-        for category, amount in expenses.items():
-            percentage = (amount / total * 100) if total > 0 else 0
-            breakdown[category] = {
+        return {
+            category: {
                 'amount': amount,
-                'percentage': f"{percentage:.1f}%",
-                'budget_status': 'over' if amount > data.get('budget', {}).get(category, float('inf')) else 'within'
+                'percentage': f"{(amount / total * 100) if total > 0 else 0:.1f}%",
+                'budget_status': 'over' if amount > budget.get(category, no_limit) else 'within'
             }
-        
-        return breakdown
+            for category, amount in expenses.items()
+        }
     
     def _top_merchants(self, data: Dict) -> List[Dict]:
         """Top spending merchants"""
         merchants = data.get('merchant_spending', {})
-        sorted_merchants = sorted(merchants.items(), key=lambda x: x[1], reverse=True)[:10]
+        sorted_merchants = heapq.nlargest(10, merchants.items(), key=itemgetter(1))
         
         return [
             {'merchant': m, 'amount': a, 'rank': i+1}
@@ -128,11 +146,10 @@ class MonthlyReportGenerator:
             'confidence': 'medium'
         }
     
-    def _recommendations(self, data: Dict) -> List[str]:
+    def _recommendations(self, data: Dict, summary: Dict[str, Any]) -> List[str]:
         """Personalized recommendations"""
         recommendations = []
         
-        summary = self._generate_summary(data)
         savings_rate = float(summary['savings_rate'].rstrip('%'))
         
         if savings_rate < 20:
@@ -156,18 +173,16 @@ class MonthlyReportGenerator:
         
         return recommendations
     
-    def _generate_highlights(self, data: Dict) -> List[str]:
+    def _generate_highlights(self, data: Dict, summary: Dict[str, Any]) -> List[str]:
         """Generate key highlights"""
         highlights = []
         
-        summary = self._generate_summary(data)
-        
         highlights.append(f"💰 Saved ₹{summary['net_savings']:.0f} this month ({summary['savings_rate']})")
         
         # Largest expense
         expenses = data.get('expenses_by_category', {})
         if expenses:
-            largest = max(expenses.items(), key=lambda x: x[1])
+            largest = max(expenses.items(), key=itemgetter(1))
             highlights.append(f"📊 Largest spending: {largest[0].title()} (₹{largest[1]:.0f})")
         
         # Transaction count
@@ -177,7 +192,8 @@ class MonthlyReportGenerator:
     
     def export_report_text(self, report: Dict) -> str:
         """Export report as formatted text"""
-        text = f"""
+        summary = report['summary']
+        parts = [f"""
 ╔══════════════════════════════════════════════════════════╗
 ║          BUDGETPAY AI - MONTHLY FINANCIAL REPORT         ║
 ║          {report['report_date']}                         ║
@@ -185,36 +201,37 @@ class MonthlyReportGenerator:
 
 📊 SUMMARY
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Income:          ₹{report['summary']['total_income']:,.2f}
-Expenses:        ₹{report['summary']['total_expenses']:,.2f}
-Net Savings:     ₹{report['summary']['net_savings']:,.2f}
-Savings Rate:    {report['summary']['savings_rate']}
-Status:          {report['summary']['status'].upper()}
+Income:          ₹{summary['total_income']:,.2f}
+Expenses:        ₹{summary['total_expenses']:,.2f}
+Net Savings:     ₹{summary['net_savings']:,.2f}
+Savings Rate:    {summary['savings_rate']}
+Status:          {summary['status'].upper()}
 
 💡 KEY HIGHLIGHTS
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-"""
-        for highlight in report['highlights']:
-            text += f"  {highlight}\n"
+"""]
+        # Collect pieces and join once instead of growing a string with +=
+        parts.extend(_BULLET_FMT(highlight) for highlight in report['highlights'])
         
-        text += f"""
+        parts.append("""
 📈 CATEGORY BREAKDOWN
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-"""
-        for category, data in report['category_breakdown'].items():
-            text += f"  {category.title():<15} ₹{data['amount']:>10,.2f}  ({data['percentage']})\n"
+""")
+        parts.extend(
+            _CATEGORY_LINE_FMT(category.title(), data['amount'], data['percentage'])
+            for category, data in report['category_breakdown'].items()
+        )
         
-        text += f"""
+        parts.append("""
 🎯 RECOMMENDATIONS
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-"""
-        for rec in report['recommendations']:
-            text += f"  {rec}\n"
+""")
+        parts.extend(_BULLET_FMT(rec) for rec in report['recommendations'])
         
-        text += "\n" + "═" * 60 + "\n"
-        text += "Generated by BudgetPay AI - Your Smart Finance Assistant\n"
+        parts.append("\n" + "═" * 60 + "\n")
+        parts.append("Generated by BudgetPay AI - Your Smart Finance Assistant\n")
         
-        return text
+        return ''.join(parts)
 
 
 class SpendingAlertSystem:
@@ -228,7 +245,8 @@ class SpendingAlertSystem:
             'unusual_spending': 2.0  # 2x average
         }
     
-    def check_budget_alerts(self, category: str, spent: float, budget: float) -> List[Dict]:
+    def check_budget_alerts(self, category: str, spent: float, budget: float,
+                            include_messages: bool = True) -> List[Dict]:
         """Check if spending triggers budget alerts"""
         alerts = []
         
@@ -242,7 +260,6 @@ class SpendingAlertSystem:
                 'type': 'budget_exceeded',
                 'severity': 'high',
                 'category': category,
-                'message': f"🚨 Budget EXCEEDED for {category}! Spent ₹{spent:.0f} of ₹{budget:.0f} ({percentage*100:.0f}%)",
                 'spent': spent,
                 'budget': budget,
                 'overspend': spent - budget
@@ -252,12 +269,16 @@ class SpendingAlertSystem:
                 'type': 'budget_warning',
                 'severity': 'medium',
                 'category': category,
-                'message': f"⚠️ Approaching budget limit for {category}. Spent ₹{spent:.0f} of ₹{budget:.0f} ({percentage*100:.0f}%)",
                 'spent': spent,
                 'budget': budget,
                 'remaining': budget - spent
             })
         
+        # Without messages, format_alert_notification renders them on demand
+        if include_messages:
+            for alert in alerts:
+                alert['message'] = _BUDGET_ALERT_FMT[alert['type']](category, spent, budget, percentage * 100)
+        
         return alerts
     
     def check_transaction_alerts(self, transaction: Dict, user_profile: Dict) -> List[Dict]:
@@ -312,42 +333,49 @@ class SpendingAlertSystem:
             }
         return None
     
-    def get_all_alerts(self, spending_data: Dict, budgets: Dict, user_profile: Dict) -> List[Dict]:
+    def get_all_alerts(self, spending_data: Dict, budgets: Dict, user_profile: Dict,
+                       include_messages: bool = True) -> List[Dict]:
         """Get all active alerts"""
-        all_alerts = []
+        # Alerts grouped by severity rank as they are produced
+        buckets = [[] for _ in range(len(_SEVERITY_RANK) + 1)]
         
-        # Check budget alerts for each category
+        # Check budget alerts for each category; only categories past the
+        # lowest threshold can alert, so skip the rest before building anything
+        min_ratio = min(self.alert_thresholds['budget_warning'], self.alert_thresholds['budget_exceeded'])
         for category, spent in spending_data.items():
             budget = budgets.get(category, 0)
-            if budget > 0:
-                alerts = self.check_budget_alerts(category, spent, budget)
-                all_alerts.extend(alerts)
-        
-        # Sort by severity
-        severity_order = {'high': 0, 'medium': 1, 'low': 2}
-        all_alerts.sort(key=lambda x: severity_order.get(x['severity'], 3))
+            if budget > 0 and spent / budget >= min_ratio:
+                for alert in self.check_budget_alerts(category, spent, budget, include_messages):
+                    buckets[_SEVERITY_RANK.get(alert['severity'], len(_SEVERITY_RANK))].append(alert)
         
-        return all_alerts
+        # Concatenating the buckets is a stable sort by severity
+        return [alert for bucket in buckets for alert in bucket]
     
     def format_alert_notification(self, alert: Dict) -> str:
         """Format alert for notification"""
-        return alert['message']
+        if 'message' in alert:
+            return alert['message']
+        
+        # Budget alert built without its message
+        spent, budget = alert['spent'], alert['budget']
+        return _BUDGET_ALERT_FMT[alert['type']](alert['category'], spent, budget, spent / budget * 100)
 
 
 def generate_weekly_digest(transactions: List[Dict], budget: Dict) -> str:
     """Generate weekly spending digest"""
-    # Calculate weekly totals
-    total_spent = sum(t.get('amount', 0) for t in transactions if t.get('type') == 'debit')
-    transaction_count = len([t for t in transactions if t.get('type') == 'debit'])
-    
-    # Category breakdown
+    # Weekly totals and category breakdown in a single pass over debits
+    total_spent = 0
+    transaction_count = 0
     category_spending = {}
     for txn in transactions:
         if txn.get('type') == 'debit':
+            amount = txn.get('amount', 0)
             cat = txn.get('category', 'other')
-            category_spending[cat] = category_spending.get(cat, 0) + txn.get('amount', 0)
+            total_spent += amount
+            transaction_count += 1
+            category_spending[cat] = category_spending.get(cat, 0) + amount
     
-    top_category = max(category_spending.items(), key=lambda x: x[1]) if category_spending else ('None', 0)
+    top_category = max(category_spending.items(), key=itemgetter(1)) if category_spending else ('None', 0)
     
     digest = f"""
 📅 WEEKLY SPENDING DIGEST
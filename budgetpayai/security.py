@@ -1,19 +1,60 @@
 """
 Security, encryption, and fraud detection
 """
+import bisect
 import hashlib
+import heapq
 import secrets
-import json
+import re
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from functools import partial
+from typing import Dict, List, Any, Optional, Tuple
 import base64
+import os
+
+import numpy as np
+import orjson
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+# AES-GCM nonce length in bytes
+_NONCE_SIZE = 12
+# Random bytes per session token
+_TOKEN_BYTES = 32
+# Audit export: pretty-printed, numpy values and non-str keys like json.dump
+_EXPORT_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _iso_hour(timestamp: Any) -> int:
+    """Hour of an ISO timestamp, or -1 if it cannot be parsed"""
+    try:
+        return datetime.fromisoformat(timestamp).hour
+    except (TypeError, ValueError):
+        return -1
+
+
+def _is_member(value: Any, values: frozenset) -> bool:
+    """value in values; unhashable values (e.g. Plaid-style list categories) never match"""
+    try:
+        return value in values
+    except TypeError:
+        return False
 
 
 class DataEncryption:
     """End-to-end encryption for sensitive data"""
     
-    def __init__(self, master_key: Optional[str] = None):
+    SENSITIVE_FIELDS = frozenset(['card_number', 'account_number', 'cvv', 'pin'])
+    
+    def __init__(self, master_key: Optional[str] = None, hash_algorithm: str = 'sha256'):
         self.master_key = master_key or self._generate_key()
+        # AES-256-GCM keyed from the master key (any string is accepted)
+        self._aes = AESGCM(hashlib.sha256(self.master_key.encode()).digest())
+        # Any hashlib algorithm; 'blake2b' is faster than SHA-256 on CPUs
+        # without SHA extensions. Validate and resolve the constructor once
+        hashlib.new(hash_algorithm)
+        self.hash_algorithm = hash_algorithm
+        self._hash_constructor = getattr(hashlib, hash_algorithm, None) or partial(hashlib.new, hash_algorithm)
     
     def _generate_key(self) -> str:
         """Generate encryption key"""
@@ -21,54 +62,35 @@ class DataEncryption:
     
     def encrypt_data(self, data: str) -> str:
         """Encrypt sensitive data"""
-        # Simple XOR encryption (use proper encryption in production like Fernet)
-        key_bytes = self.master_key.encode()
-        data_bytes = data.encode()
-        
-        encrypted = bytearray()
-        for i, byte in enumerate(data_bytes):
-            encrypted.append(byte ^ key_bytes[i % len(key_bytes)])
-        
-        return base64.b64encode(encrypted).decode()
+        # Authenticated encryption; a fresh 96-bit nonce is prepended to the ciphertext
+        nonce = os.urandom(_NONCE_SIZE)
+        encrypted = self._aes.encrypt(nonce, data.encode(), None)
+        return base64.b64encode(nonce + encrypted).decode()
     
     def decrypt_data(self, encrypted_data: str) -> str:
         """Decrypt data"""
         encrypted_bytes = base64.b64decode(encrypted_data.encode())
-        key_bytes = self.master_key.encode()
-        
-        decrypted = bytearray()
-        for i, byte in enumerate(encrypted_bytes):
-            decrypted.append(byte ^ key_bytes[i % len(key_bytes)])
-        
-        return decrypted.decode()
+        nonce, encrypted = encrypted_bytes[:_NONCE_SIZE], encrypted_bytes[_NONCE_SIZE:]
+        return self._aes.decrypt(nonce, encrypted, None).decode()
     
     def hash_sensitive_field(self, data: str) -> str:
         """One-way hash for sensitive fields"""
-        return hashlib.sha256(data.encode()).hexdigest()
+        return self._hash_constructor(data.encode()).hexdigest()
     
     def encrypt_transaction(self, transaction: Dict) -> Dict:
         """Encrypt sensitive transaction fields"""
-        encrypted = transaction.copy()
-        
-        sensitive_fields = ['card_number', 'account_number', 'cvv', 'pin']
-        
-        for field in sensitive_fields:
-            if field in encrypted:
-                encrypted[field] = self.encrypt_data(str(encrypted[field]))
-        
-        return encrypted
+        # Copy and encrypt in one walk over the transaction
+        return {
+            field: self.encrypt_data(str(value)) if field in self.SENSITIVE_FIELDS else value
+            for field, value in transaction.items()
+        }
     
     def decrypt_transaction(self, encrypted_transaction: Dict) -> Dict:
         """Decrypt transaction"""
-        decrypted = encrypted_transaction.copy()
-        
-        sensitive_fields = ['card_number', 'account_number', 'cvv', 'pin']
-        
-        for field in sensitive_fields:
-            if field in decrypted:
-                decrypted[field] = self.decrypt_data(decrypted[field])
-        
-        return decrypted
+        return {
+            field: self.decrypt_data(value) if field in self.SENSITIVE_FIELDS else value
+            for field, value in encrypted_transaction.items()
+        }
 
 
 class FraudDetector:
@@ -84,6 +106,12 @@ class FraudDetector:
         }
         
         self.high_risk_categories = ['gambling', 'crypto', 'international']
+        
+        # Suspicious merchant keywords, matched case-insensitively in one scan
+        self.suspicious_merchant_keywords = ['unknown', 'temp', 'test', 'fake']
+        self._suspicious_merchant_re = re.compile(
+            '|'.join(map(re.escape, self.suspicious_merchant_keywords)), re.IGNORECASE
+        )
     
     def detect_fraud(self, transaction: Dict, user_profile: Dict) -> Dict[str, Any]:
         """Detect potential fraud in transaction"""
@@ -141,6 +169,34 @@ class FraudDetector:
             'requires_verification': fraud_score >= 40
         }
     
+    def detect_fraud_batch(self, transactions: List[Dict], user_profile: Dict) -> np.ndarray:
+        """Fraud scores for many transactions, scored as in detect_fraud"""
+        n = len(transactions)
+        scores = np.zeros(n, dtype=np.int32)
+        if not n:
+            return scores
+        
+        # Extract each column once, then score with array operations
+        amounts = np.fromiter((t.get('amount', 0) for t in transactions), dtype=np.float64, count=n)
+        high_risk = frozenset(self.high_risk_categories)
+        risky = np.fromiter((_is_member(t.get('category', ''), high_risk) for t in transactions),
+                            dtype=bool, count=n)
+        now_hour = datetime.now().hour
+        hours = np.fromiter(
+            (_iso_hour(t['timestamp']) if 'timestamp' in t else now_hour for t in transactions),
+            dtype=np.int32, count=n
+        )
+        
+        avg_transaction = user_profile.get('average_transaction', 1000)
+        scores += np.where(amounts > avg_transaction * self.fraud_indicators['unusual_amount'], 30, 0)
+        scores += np.where(risky, 20, 0)
+        # Rapid transactions depend only on the profile, so they apply to every row
+        if len(user_profile.get('recent_transactions', [])) >= self.fraud_indicators['rapid_transactions']:
+            scores += 25
+        scores += np.where((hours >= 0) & ((hours < 6) | (hours > 23)), 15, 0)
+        
+        return scores
+    
     def analyze_spending_pattern(self, transactions: List[Dict]) -> Dict[str, Any]:
         """Analyze spending patterns for anomalies"""
         if not transactions:
@@ -149,15 +205,13 @@ class FraudDetector:
         amounts = [t.get('amount', 0) for t in transactions]
         avg_amount = sum(amounts) / len(amounts)
         
-        # Find outliers
-        outliers = []
-        for txn in transactions:
-            amount = txn.get('amount', 0)
-            if amount > avg_amount * 3:
-                outliers.append({
-                    'transaction': txn,
-                    'deviation': round((amount / avg_amount), 2)
-                })
+        # Find outliers, reusing the extracted amounts and a hoisted threshold
+        threshold = avg_amount * 3
+        outliers = [
+            {'transaction': txn, 'deviation': round(amount / avg_amount, 2)}
+            for txn, amount in zip(transactions, amounts)
+            if amount > threshold
+        ]
         
         # Check for duplicate transactions
         duplicates = self._find_duplicates(transactions)
@@ -178,7 +232,7 @@ class FraudDetector:
         seen = {}
         
         for txn in transactions:
-            key = f"{txn.get('amount')}_{txn.get('merchant')}_{txn.get('timestamp', '')[:10]}"
+            key = (txn.get('amount'), txn.get('merchant'), (txn.get('timestamp') or '')[:10])
             if key in seen:
                 duplicates.append({
                     'original': seen[key],
@@ -192,9 +246,7 @@ class FraudDetector:
     def check_merchant_reputation(self, merchant: str) -> Dict[str, Any]:
         """Check merchant reputation (placeholder)"""
         # In production, integrate with merchant reputation APIs
-        suspicious_keywords = ['unknown', 'temp', 'test', 'fake']
-        
-        is_suspicious = any(keyword in merchant.lower() for keyword in suspicious_keywords)
+        is_suspicious = self._suspicious_merchant_re.search(merchant) is not None
         
         return {
             'merchant': merchant,
@@ -212,33 +264,61 @@ class AuthenticationManager:
         self.failed_attempts = {}
         self.max_failed_attempts = 3
         self.lockout_duration = 30  # minutes
+        self.session_duration = 24  # hours
+        # (expires_at_ts, token) min-heap for evicting expired sessions
+        self._expiry_heap: List[Tuple[float, str]] = []
     
     def create_session(self, user_id: str) -> str:
         """Create new session"""
-        session_token = secrets.token_urlsafe(32)
-        self.sessions[session_token] = {
-            'user_id': user_id,
-            'created_at': datetime.now().isoformat(),
-            'expires_at': (datetime.now() + timedelta(hours=24)).isoformat(),
-            'active': True
-        }
-        return session_token
+        return self.create_sessions([user_id])[0]
+    
+    def create_sessions(self, user_ids: List[str]) -> List[str]:
+        """Create one session per user, drawing all token bytes in one urandom call"""
+        self._evict_expired_sessions()
+        
+        raw = os.urandom(_TOKEN_BYTES * len(user_ids))
+        now = datetime.now()
+        expires_at = now + timedelta(hours=self.session_duration)
+        created_iso, expires_iso = now.isoformat(), expires_at.isoformat()
+        expires_at_ts = expires_at.timestamp()
+        
+        tokens = []
+        for i, user_id in enumerate(user_ids):
+            # Same format as secrets.token_urlsafe(32)
+            chunk = raw[i * _TOKEN_BYTES:(i + 1) * _TOKEN_BYTES]
+            session_token = base64.urlsafe_b64encode(chunk).rstrip(b'=').decode('ascii')
+            self.sessions[session_token] = {
+                'user_id': user_id,
+                'created_at': created_iso,
+                'expires_at': expires_iso,
+                'expires_at_ts': expires_at_ts,
+                'active': True
+            }
+            heapq.heappush(self._expiry_heap, (expires_at_ts, session_token))
+            tokens.append(session_token)
+        return tokens
     
     def validate_session(self, session_token: str) -> bool:
         """Validate session token"""
-        if session_token not in self.sessions:
+        session = self.sessions.get(session_token)
+        if session is None:
             return False
         
-        session = self.sessions[session_token]
-        
-        # Check if expired
-        expires_at = datetime.fromisoformat(session['expires_at'])
-        if datetime.now() > expires_at:
+        # Check if expired (numeric compare, no ISO parsing)
+        if time.time() > session['expires_at_ts']:
             session['active'] = False
             return False
         
         return session['active']
     
+    def _evict_expired_sessions(self):
+        """Drop sessions whose expiry has passed, oldest first"""
+        now = time.time()
+        heap = self._expiry_heap
+        while heap and heap[0][0] < now:
+            _, session_token = heapq.heappop(heap)
+            self.sessions.pop(session_token, None)
+    
     def revoke_session(self, session_token: str):
         """Revoke session"""
         if session_token in self.sessions:
@@ -283,20 +363,32 @@ class DeviceManager:
     
     def register_device(self, user_id: str, device_info: Dict) -> str:
         """Register new device"""
-        device_id = secrets.token_hex(16)
+        return self.register_devices(user_id, [device_info])[0]
+    
+    def register_devices(self, user_id: str, device_infos: List[Dict]) -> List[str]:
+        """Register several devices, drawing all ID bytes in one urandom call"""
+        # Same format as secrets.token_hex(16)
+        raw = os.urandom(16 * len(device_infos)).hex()
+        now = datetime.now().isoformat()
         
         if user_id not in self.trusted_devices:
             self.trusted_devices[user_id] = {}
+        devices = self.trusted_devices[user_id]
+        
+        device_ids = []
+        for i, device_info in enumerate(device_infos):
+            device_id = raw[i * 32:(i + 1) * 32]
+            devices[device_id] = {
+                'device_id': device_id,
+                'device_name': device_info.get('name', 'Unknown'),
+                'device_type': device_info.get('type', 'unknown'),
+                'registered_at': now,
+                'last_used': now,
+                'trusted': False
+            }
+            device_ids.append(device_id)
         
-        self.trusted_devices[user_id][device_id] = {
-            'device_name': device_info.get('name', 'Unknown'),
-            'device_type': device_info.get('type', 'unknown'),
-            'registered_at': datetime.now().isoformat(),
-            'last_used': datetime.now().isoformat(),
-            'trusted': False
-        }
-        
-        return device_id
+        return device_ids
     
     def is_trusted_device(self, user_id: str, device_id: str) -> bool:
         """Check if device is trusted"""
@@ -315,16 +407,8 @@ class DeviceManager:
     
     def get_user_devices(self, user_id: str) -> List[Dict]:
         """Get all user devices"""
-        if user_id not in self.trusted_devices:
-            return []
-        
-        return [
-            {
-                'device_id': did,
-                **info
-            }
-            for did, info in self.trusted_devices[user_id].items()
-        ]
+        # Records already carry their device_id
+        return list(self.trusted_devices.get(user_id, {}).values())
     
     def revoke_device(self, user_id: str, device_id: str):
         """Revoke device access"""
@@ -335,40 +419,59 @@ class DeviceManager:
 class AuditLogger:
     """Log security events for audit"""
     
+    _SUSPICIOUS = frozenset({'failed_login', 'fraud_detected', 'unusual_transaction'})
+    
     def __init__(self):
         self.logs = []
+        # Parsed event times (parallel to logs) and per-user log indices,
+        # both in append order, so activity queries can bisect
+        self._timestamps: List[datetime] = []
+        # Wall-clock times can step back (NTP, DST); bisect only while they are sorted
+        self._timestamps_sorted = True
+        self._by_user: Dict[str, List[int]] = {}
+        # Indices of suspicious entries, maintained as events are logged
+        self._suspicious_idx: List[int] = []
     
     def log_event(self, event_type: str, user_id: str, details: Dict):
         """Log security event"""
+        now = datetime.now()
         log_entry = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now.isoformat(),
             'event_type': event_type,
             'user_id': user_id,
             'details': details,
             'ip_address': details.get('ip_address', 'unknown')
         }
         
+        index = len(self.logs)
+        self._by_user.setdefault(user_id, []).append(index)
+        if event_type in self._SUSPICIOUS:
+            self._suspicious_idx.append(index)
+        if self._timestamps and now < self._timestamps[-1]:
+            self._timestamps_sorted = False
+        self._timestamps.append(now)
         self.logs.append(log_entry)
     
     def get_user_activity(self, user_id: str, days: int = 30) -> List[Dict]:
         """Get user activity logs"""
         cutoff = datetime.now() - timedelta(days=days)
         
-        return [
-            log for log in self.logs
-            if log['user_id'] == user_id and datetime.fromisoformat(log['timestamp']) > cutoff
-        ]
+        indices = self._by_user.get(user_id, [])
+        if not self._timestamps_sorted:
+            timestamps = self._timestamps
+            return [self.logs[i] for i in indices if timestamps[i] > cutoff]
+        
+        # First log newer than the cutoff, then the user's entries from there on
+        first = bisect.bisect_right(self._timestamps, cutoff)
+        return [self.logs[i] for i in indices[bisect.bisect_left(indices, first):]]
     
     def get_suspicious_activity(self) -> List[Dict]:
         """Get suspicious activity"""
-        suspicious_events = ['failed_login', 'fraud_detected', 'unusual_transaction']
-        
-        return [
-            log for log in self.logs
-            if log['event_type'] in suspicious_events
-        ]
+        logs = self.logs
+        return [logs[i] for i in self._suspicious_idx]
     
     def export_logs(self, filename: str = 'audit_log.json'):
         """Export logs to file"""
-        with open(filename, 'w') as f:
-            json.dump(self.logs, f, indent=2)
+        # orjson encodes in C and returns bytes, so write in binary mode
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(self.logs, option=_EXPORT_OPTIONS))
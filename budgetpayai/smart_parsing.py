@@ -3,16 +3,26 @@ SMS/Email parsing and OCR for automatic transaction detection
 """
 import re
 from datetime import datetime
+from operator import itemgetter
 from typing import Dict, List, Optional, Any
 import json
 
 
+def _first_capture(patterns: List[re.Pattern], text: str) -> Optional[str]:
+    """Group captured by the first pattern, in list order, that matches"""
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match.group(1)
+    return None
+
+
 class SMSParser:
     """Parse bank SMS messages to extract transaction details"""
     
     def __init__(self):
-        # Common bank SMS patterns
-        self.patterns = {
+        # Common bank SMS patterns, compiled once
+        raw_patterns = {
             'debit': [
                 r'debited.*?Rs\.?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
                 r'spent.*?Rs\.?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
@@ -36,14 +46,25 @@ class SMSParser:
                 r'(?:balance|bal|avl\s+bal).*?Rs\.?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
             ]
         }
+        self.patterns = {
+            field: [re.compile(p, re.IGNORECASE) for p in patterns]
+            for field, patterns in raw_patterns.items()
+        }
+        
+        self.debit_keywords = ['debited', 'spent', 'withdrawn', 'paid']
+        self.credit_keywords = ['credited', 'received', 'deposited']
+        # Any transaction keyword; lets bulk parsing drop other messages in one scan
+        self.keyword_pattern = re.compile(
+            '|'.join(self.debit_keywords + self.credit_keywords), re.IGNORECASE
+        )
     
     def parse_sms(self, message: str) -> Optional[Dict[str, Any]]:
         """Parse a bank SMS message"""
         message_lower = message.lower()
         
         # Detect transaction type
-        is_debit = any(word in message_lower for word in ['debited', 'spent', 'withdrawn', 'paid'])
-        is_credit = any(word in message_lower for word in ['credited', 'received', 'deposited'])
+        is_debit = any(word in message_lower for word in self.debit_keywords)
+        is_credit = any(word in message_lower for word in self.credit_keywords)
         
         if not (is_debit or is_credit):
             return None
@@ -58,44 +79,43 @@ class SMSParser:
             'raw_message': message
         }
         
-        # Extract amount
-        patterns = self.patterns['debit'] if is_debit else self.patterns['credit']
-        for pattern in patterns:
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                amount_str = match.group(1).replace(',', '')
-                transaction['amount'] = float(amount_str)
-                break
+        # Extract amount; without one the message is dropped, so stop there
+        fields = self.patterns
+        amount_str = None
+        if 'rs' in message_lower:
+            amount_str = _first_capture(fields['debit' if is_debit else 'credit'], message)
+        if not amount_str:
+            return None
+        transaction['amount'] = float(amount_str.replace(',', ''))
+        if not transaction['amount']:
+            return None
         
-        # Extract merchant
-        for pattern in self.patterns['merchant']:
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                transaction['merchant'] = match.group(1).strip()
-                break
+        # Extract merchant, card number and balance, skipping scans whose
+        # required literal ('card'/'XX', 'bal') is absent
+        merchant = _first_capture(fields['merchant'], message)
+        if merchant:
+            transaction['merchant'] = merchant.strip()
         
-        # Extract card number
-        for pattern in self.patterns['card']:
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                transaction['card_last4'] = match.group(1)
-                break
+        if 'card' in message_lower or 'xx' in message_lower:
+            transaction['card_last4'] = _first_capture(fields['card'], message)
         
-        # Extract balance
-        for pattern in self.patterns['balance']:
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                balance_str = match.group(1).replace(',', '')
-                transaction['balance'] = float(balance_str)
-                break
+        if 'bal' in message_lower:
+            balance_str = _first_capture(fields['balance'], message)
+            if balance_str:
+                transaction['balance'] = float(balance_str.replace(',', ''))
         
-        return transaction if transaction['amount'] else None
+        return transaction
     
     def parse_bulk_sms(self, messages: List[str]) -> List[Dict[str, Any]]:
         """Parse multiple SMS messages"""
         transactions = []
+        has_keyword = self.keyword_pattern.search
+        parse = self.parse_sms
         for msg in messages:
-            parsed = self.parse_sms(msg)
+            # Non-transaction messages never parse, so skip them up front
+            if not has_keyword(msg):
+                continue
+            parsed = parse(msg)
             if parsed:
                 transactions.append(parsed)
         return transactions
@@ -106,6 +126,14 @@ class EmailParser:
     
     def __init__(self):
         self.bill_keywords = ['bill', 'invoice', 'payment due', 'statement', 'due date']
+        self.amount_patterns = [
+            re.compile(r'(?:amount|total|due).*?Rs\.?\s*(\d+(?:,\d+)*(?:\.\d+)?)', re.IGNORECASE),
+            re.compile(r'Rs\.?\s*(\d+(?:,\d+)*(?:\.\d+)?)', re.IGNORECASE),
+        ]
+        self.date_patterns = [
+            re.compile(r'due\s+(?:date|on)?\s*:?\s*(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', re.IGNORECASE),
+            re.compile(r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})'),
+        ]
     
     def parse_email(self, subject: str, body: str) -> Optional[Dict[str, Any]]:
         """Parse bank/bill email"""
@@ -116,12 +144,15 @@ class EmailParser:
         is_bill = any(keyword in subject_lower or keyword in body_lower for keyword in self.bill_keywords)
         
         if is_bill:
-            return self._parse_bill_email(subject, body)
+            return self._parse_bill_email(subject, body, body_lower)
         else:
             return self._parse_transaction_email(subject, body)
     
-    def _parse_bill_email(self, subject: str, body: str) -> Dict[str, Any]:
+    def _parse_bill_email(self, subject: str, body: str, body_lower: Optional[str] = None) -> Dict[str, Any]:
         """Parse bill/invoice email"""
+        if body_lower is None:
+            body_lower = body.lower()
+        
         bill = {
             'type': 'bill',
             'amount': None,
@@ -130,30 +161,22 @@ class EmailParser:
             'subject': subject
         }
         
-        # Extract amount
-        amount_patterns = [
-            r'(?:amount|total|due).*?Rs\.?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-            r'Rs\.?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-        ]
-        
-        for pattern in amount_patterns:
-            match = re.search(pattern, body, re.IGNORECASE)
-            if match:
-                amount_str = match.group(1).replace(',', '')
-                bill['amount'] = float(amount_str)
-                break
-        
-        # Extract due date
-        date_patterns = [
-            r'due\s+(?:date|on)?\s*:?\s*(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
-            r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
-        ]
+        # Extract amount (every amount pattern needs "Rs", so check that first)
+        if 'rs' in body_lower:
+            for pattern in self.amount_patterns:
+                match = pattern.search(body)
+                if match:
+                    amount_str = match.group(1).replace(',', '')
+                    bill['amount'] = float(amount_str)
+                    break
         
-        for pattern in date_patterns:
-            match = re.search(pattern, body, re.IGNORECASE)
-            if match:
-                bill['due_date'] = match.group(1)
-                break
+        # Extract due date (dates need a '-' or '/' separator)
+        if '/' in body or '-' in body:
+            for pattern in self.date_patterns:
+                match = pattern.search(body)
+                if match:
+                    bill['due_date'] = match.group(1)
+                    break
         
         # Extract biller from subject
         bill['biller'] = subject.split()[0] if subject else 'Unknown'
@@ -175,11 +198,15 @@ class OCRReceiptParser:
     
     def __init__(self):
         self.amount_patterns = [
-            r'total.*?(\d+(?:\.\d+)?)',
-            r'amount.*?(\d+(?:\.\d+)?)',
-            r'₹\s*(\d+(?:\.\d+)?)',
-            r'rs\.?\s*(\d+(?:\.\d+)?)',
+            re.compile(p, re.IGNORECASE) for p in [
+                r'total.*?(\d+(?:\.\d+)?)',
+                r'amount.*?(\d+(?:\.\d+)?)',
+                r'₹\s*(\d+(?:\.\d+)?)',
+                r'rs\.?\s*(\d+(?:\.\d+)?)',
+            ]
         ]
+        self.date_pattern = re.compile(r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})')
+        self.item_pattern = re.compile(r'\d+(?:\.\d+)?')
     
     def parse_receipt_text(self, ocr_text: str) -> Dict[str, Any]:
         """Parse OCR text from receipt"""
@@ -197,23 +224,26 @@ class OCRReceiptParser:
         if lines:
             receipt['merchant'] = lines[0].strip()
         
-        # Extract amount
+        # Extract amount (patterns are in priority order and may span lines)
         for pattern in self.amount_patterns:
-            match = re.search(pattern, ocr_text, re.IGNORECASE)
+            match = pattern.search(ocr_text)
             if match:
                 receipt['amount'] = float(match.group(1))
                 break
         
-        # Extract date
-        date_pattern = r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})'
-        match = re.search(date_pattern, ocr_text)
-        if match:
-            receipt['date'] = match.group(1)
-        
-        # Extract items (lines with prices)
+        # Extract items (lines with prices) and the date in one pass; a date
+        # always contains digits, so only item lines can hold it
+        items = receipt['items']
+        has_number = self.item_pattern.search
+        find_date = self.date_pattern.search
         for line in lines:
-            if re.search(r'\d+(?:\.\d+)?', line):
-                receipt['items'].append(line.strip())
+            if not has_number(line):
+                continue
+            items.append(line.strip())
+            if receipt['date'] is None:
+                match = find_date(line)
+                if match:
+                    receipt['date'] = match.group(1)
         
         return receipt
     
@@ -246,18 +276,28 @@ class TransactionCategorizer:
             'investment': ['mutual fund', 'sip', 'stock', 'zerodha', 'groww', 'upstox'],
             'transfer': ['transfer', 'upi', 'neft', 'imps', 'rtgs'],
         }
+        
+        # One capture group per category, in priority order, inside a lookahead
+        # so overlapping hits are all reported; a match's lastindex is its
+        # category's position, and case is ignored instead of lowercasing
+        self._categories = list(self.category_keywords)
+        self._keyword_pattern = re.compile(
+            '(?=' + '|'.join(
+                '(' + '|'.join(map(re.escape, keywords)) + ')'
+                for keywords in self.category_keywords.values()
+            ) + ')',
+            re.IGNORECASE
+        )
     
     def categorize(self, merchant: str, amount: float = None) -> str:
         """Categorize transaction based on merchant name"""
         if not merchant:
             return 'other'
         
-        merchant_lower = merchant.lower()
-        
-        # Check keywords
-        for category, keywords in self.category_keywords.items():
-            if any(keyword in merchant_lower for keyword in keywords):
-                return category
+        # Check keywords in one scan; the earliest-listed category wins
+        ranks = [m.lastindex for m in self._keyword_pattern.finditer(merchant)]
+        if ranks:
+            return self._categories[min(ranks) - 1]
         
         # Amount-based heuristics
         if amount:
@@ -270,10 +310,9 @@ class TransactionCategorizer:
     
     def categorize_bulk(self, transactions: List[Dict]) -> List[Dict]:
         """Categorize multiple transactions"""
+        categorize = self.categorize
         for txn in transactions:
-            merchant = txn.get('merchant', '')
-            amount = txn.get('amount', 0)
-            txn['category'] = self.categorize(merchant, amount)
+            txn['category'] = categorize(txn.get('merchant', ''), txn.get('amount', 0))
         return transactions
 
 
@@ -313,24 +352,27 @@ class SmartTransactionDetector:
         if not transactions:
             return {'message': 'No transactions to analyze'}
         
-        total_spent = sum(t.get('amount', 0) for t in transactions if t.get('type') == 'debit')
-        total_received = sum(t.get('amount', 0) for t in transactions if t.get('type') == 'credit')
-        
-        # Category breakdown
+        # Totals, category and merchant breakdowns in a single pass
+        total_spent = 0
+        total_received = 0
+        debit_count = 0
         category_spending = {}
-        for txn in transactions:
-            if txn.get('type') == 'debit':
-                cat = txn.get('category', 'other')
-                category_spending[cat] = category_spending.get(cat, 0) + txn.get('amount', 0)
-        
-        # Top merchant
         merchant_spending = {}
         for txn in transactions:
-            if txn.get('type') == 'debit' and txn.get('merchant'):
-                merch = txn['merchant']
-                merchant_spending[merch] = merchant_spending.get(merch, 0) + txn.get('amount', 0)
+            txn_type = txn.get('type')
+            if txn_type == 'debit':
+                amount = txn.get('amount', 0)
+                total_spent += amount
+                debit_count += 1
+                cat = txn.get('category', 'other')
+                category_spending[cat] = category_spending.get(cat, 0) + amount
+                merch = txn.get('merchant')
+                if merch:
+                    merchant_spending[merch] = merchant_spending.get(merch, 0) + amount
+            elif txn_type == 'credit':
+                total_received += txn.get('amount', 0)
         
-        top_merchant = max(merchant_spending.items(), key=lambda x: x[1]) if merchant_spending else ('None', 0)
+        top_merchant = max(merchant_spending.items(), key=itemgetter(1)) if merchant_spending else ('None', 0)
         
         return {
             'total_transactions': len(transactions),
@@ -339,5 +381,5 @@ class SmartTransactionDetector:
             'net_cashflow': total_received - total_spent,
             'category_breakdown': category_spending,
             'top_merchant': {'name': top_merchant[0], 'amount': top_merchant[1]},
-            'average_transaction': total_spent / len([t for t in transactions if t.get('type') == 'debit']) if transactions else 0
+            'average_transaction': total_spent / debit_count if debit_count else 0
         }
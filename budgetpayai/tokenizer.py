@@ -1,9 +1,26 @@
 """
 Simple BPE tokenizer for Aiza
 """
+import ast
+import codecs
 import json
+from functools import lru_cache
+from itertools import chain
+import numpy as np
+import orjson
 import regex as re
-from collections import Counter
+from tokenizers import Tokenizer, models, trainers
+
+
+# Symbol id for characters outside the vocab and every merge
+_UNKNOWN_ID = -1
+# Rank of pairs that have no merge
+_NO_RANK = float('inf')
+
+
+def _to_byte_str(word):
+    """UTF-8 bytes of a word as a str with one char (0-255) per byte"""
+    return word.encode('utf-8').decode('latin-1')
 
 
 class AizaTokenizer:
@@ -11,95 +28,171 @@ class AizaTokenizer:
         self.vocab_size = vocab_size
         self.vocab = {}
         self.merges = {}
+        # Tokens are UTF-8 byte strings (one char per byte, via latin-1);
+        # tokenizer files saved before byte-level BPE load as character-level
+        self.byte_level = True
         self.pattern = re.compile(r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""")
+        self._reset_word_cache()
         
     def train(self, texts):
         """Train tokenizer on text data"""
         words = []
         for text in texts:
-            words.extend(re.findall(self.pattern, text))
+            words.extend(_to_byte_str(word) for word in re.findall(self.pattern, text))
         
-        # Start with character-level vocab
+        # Start with byte-level vocab
         vocab = {chr(i): i for i in range(256)}
         
-        # Build BPE merges
-        word_freqs = Counter(words)
-        splits = {word: [c for c in word] for word in word_freqs.keys()}
-        
+        # Learn merges with the Rust BPE trainer, which updates pair counts
+        # incrementally; words are already split, so no pre-tokenizer is set
         num_merges = self.vocab_size - 256
-        for i in range(num_merges):
-            pairs = self._get_pairs(splits, word_freqs)
-            if not pairs:
-                break
-            best_pair = max(pairs, key=pairs.get)
-            splits = self._merge_pair(best_pair, splits)
+        alphabet = set().union(*set(words))
+        bpe = Tokenizer(models.BPE())
+        trainer = trainers.BpeTrainer(vocab_size=len(alphabet) + num_merges, show_progress=False)
+        bpe.train_from_iterator(words, trainer=trainer, length=len(words))
+        
+        for left, right in json.loads(bpe.to_str())['model']['merges'][:num_merges]:
+            best_pair = (left, right)
             self.merges[best_pair] = len(vocab)
             vocab[''.join(best_pair)] = len(vocab)
         
         self.vocab = vocab
         self.inverse_vocab = {v: k for k, v in vocab.items()}
-    
-    def _get_pairs(self, splits, word_freqs):
-        pairs = Counter()
-        for word, freq in word_freqs.items():
-            split = splits[word]
-            if len(split) < 2:
-                continue
-            for i in range(len(split) - 1):
-                pairs[(split[i], split[i + 1])] += freq
-        return pairs
-    
-    def _merge_pair(self, pair, splits):
-        new_splits = {}
-        for word, split in splits.items():
-            new_split = []
-            i = 0
-            while i < len(split):
-                if i < len(split) - 1 and split[i] == pair[0] and split[i + 1] == pair[1]:
-                    new_split.append(pair[0] + pair[1])
-                    i += 2
-                else:
-                    new_split.append(split[i])
-                    i += 1
-            new_splits[word] = new_split
-        return new_splits
+        self.byte_level = True
+        self._reset_word_cache()
     
     def encode(self, text):
         """Encode text to token IDs"""
         tokens = []
+        encode_word = self._encode_word
         for word in re.findall(self.pattern, text):
-            word_tokens = [c for c in word]
-            while len(word_tokens) > 1:
-                pairs = [(word_tokens[i], word_tokens[i + 1]) for i in range(len(word_tokens) - 1)]
-                pair_to_merge = min(pairs, key=lambda p: self.merges.get(p, float('inf')))
-                if pair_to_merge not in self.merges:
-                    break
-                i = 0
-                new_tokens = []
-                while i < len(word_tokens):
-                    if i < len(word_tokens) - 1 and (word_tokens[i], word_tokens[i + 1]) == pair_to_merge:
-                        new_tokens.append(word_tokens[i] + word_tokens[i + 1])
-                        i += 2
-                    else:
-                        new_tokens.append(word_tokens[i])
-                        i += 1
-                word_tokens = new_tokens
-            tokens.extend([self.vocab.get(t, 0) for t in word_tokens])
+            tokens.extend(encode_word(word))
         return tokens
     
+    def encode_batch(self, texts, max_length=None, dtype=np.int64):
+        """Encode texts into a zero-padded (B, L) id array and their lengths"""
+        findall = self.pattern.findall
+        encode_word = self._encode_word
+        encoded = [list(chain.from_iterable(map(encode_word, findall(text))))[:max_length] for text in texts]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        
+        # The row-major mask of real positions lines up with the concatenated
+        # tokens, so every row fills in one scatter
+        width = max_length if max_length is not None else int(lengths.max(initial=0))
+        ids = np.zeros((len(encoded), width), dtype=dtype)
+        ids[np.arange(width) < lengths[:, None]] = np.fromiter(
+            chain.from_iterable(encoded), dtype=dtype, count=int(lengths.sum()))
+        return ids, lengths
+    
+    def _reset_word_cache(self):
+        # Words repeat heavily in real text, so memoize their encodings;
+        # rebuilt whenever the vocab or merges change
+        self._build_pair_ranks()
+        self._encode_word = lru_cache(maxsize=100000)(self._bpe_word)
+    
+    def __getstate__(self):
+        # The memoized encoder wraps a bound method and cannot be pickled
+        # (e.g. when a dataset holding the tokenizer is sent to DataLoader workers)
+        state = self.__dict__.copy()
+        del state['_encode_word']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._encode_word = lru_cache(maxsize=100000)(self._bpe_word)
+    
+    def _build_pair_ranks(self):
+        """Index merges by integer symbol ids for encoding"""
+        # Symbols are vocab ids; merge parts missing from the vocab get their
+        # own negative ids, and any other character shares _UNKNOWN_ID
+        symbol_ids = dict(self.vocab)
+        for pair in self.merges:
+            for symbol in pair:
+                if symbol not in symbol_ids:
+                    symbol_ids[symbol] = _UNKNOWN_ID - len(symbol_ids)
+        
+        self._symbol_ids = symbol_ids
+        self._pair_rank = {}
+        self._pair_merged = {}
+        for (left, right), rank in self.merges.items():
+            pair = (symbol_ids[left], symbol_ids[right])
+            self._pair_rank[pair] = rank
+            self._pair_merged[pair] = symbol_ids[left + right]
+    
+    def _bpe_word(self, word):
+        """Apply merges to a single pre-tokenized word"""
+        symbol_ids = self._symbol_ids
+        pair_rank = self._pair_rank
+        rank_of = lambda p: pair_rank.get(p, _NO_RANK)
+        
+        if self.byte_level:
+            # Byte values are their own vocab ids
+            word_ids = list(word.encode('utf-8'))
+        else:
+            word_ids = [symbol_ids.get(c, _UNKNOWN_ID) for c in word]
+        while len(word_ids) > 1:
+            pair_to_merge = min(zip(word_ids, word_ids[1:]), key=rank_of)
+            if pair_to_merge not in pair_rank:
+                break
+            first, second = pair_to_merge
+            merged = self._pair_merged[pair_to_merge]
+            i = 0
+            new_ids = []
+            while i < len(word_ids):
+                if i < len(word_ids) - 1 and word_ids[i] == first and word_ids[i + 1] == second:
+                    new_ids.append(merged)
+                    i += 2
+                else:
+                    new_ids.append(word_ids[i])
+                    i += 1
+            word_ids = new_ids
+        # Symbols outside the vocab encode as 0
+        return tuple(i if i >= 0 else 0 for i in word_ids)
+    
     def decode(self, ids):
         """Decode token IDs to text"""
-        return ''.join([self.inverse_vocab.get(i, '') for i in ids])
+        text = ''.join([self.inverse_vocab.get(i, '') for i in ids])
+        if self.byte_level:
+            # Ids may split a multi-byte character, e.g. mid-generation
+            return text.encode('latin-1').decode('utf-8', errors='replace')
+        return text
+    
+    def decode_stream(self, ids):
+        """Decode an iterable of token IDs incrementally, yielding text as it completes"""
+        inverse_vocab = self.inverse_vocab
+        if not self.byte_level:
+            for i in ids:
+                yield inverse_vocab.get(i, '')
+            return
+        
+        # Bytes of a character split across tokens wait in the decoder
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        for i in ids:
+            piece = decoder.decode(inverse_vocab.get(i, '').encode('latin-1'))
+            if piece:
+                yield piece
+        piece = decoder.decode(b'', final=True)
+        if piece:
+            yield piece
     
     def save(self, path):
         """Save tokenizer"""
-        with open(path, 'w') as f:
-            json.dump({'vocab': self.vocab, 'merges': {str(k): v for k, v in self.merges.items()}}, f)
+        # Merges are stored as [left, right, id] rows so loading needs no parsing
+        merges = [[left, right, v] for (left, right), v in self.merges.items()]
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps({'vocab': self.vocab, 'merges': merges, 'byte_level': self.byte_level}))
     
     def load(self, path):
         """Load tokenizer"""
-        with open(path, 'r') as f:
-            data = json.load(f)
-            self.vocab = data['vocab']
-            self.merges = {eval(k): v for k, v in data['merges'].items()}
-            self.inverse_vocab = {v: k for k, v in self.vocab.items()}
+        with open(path, 'rb') as f:
+            data = orjson.loads(f.read())
+        self.vocab = data['vocab']
+        self.byte_level = data.get('byte_level', False)
+        merges = data['merges']
+        if isinstance(merges, dict):
+            # Older files keyed merges by the repr of the pair
+            self.merges = {ast.literal_eval(k): v for k, v in merges.items()}
+        else:
+            self.merges = {(left, right): v for left, right, v in merges}
+        self.inverse_vocab = {v: k for k, v in self.vocab.items()}
+        self._reset_word_cache()
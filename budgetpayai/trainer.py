@@ -11,21 +11,40 @@ import os
 
 class AizaTrainer:
     def __init__(self, model, train_data, val_data=None, lr=3e-4, device='cuda', 
-                 weight_decay=0.1, grad_clip=1.0, warmup_steps=100):
+                 weight_decay=0.1, grad_clip=1.0, warmup_steps=100, compile_model=True,
+                 accum_steps=1, dataloader_kwargs=None):
         self.model = model.to(device)
         self.train_data = train_data
         self.val_data = val_data
         self.device = device
+        self.device_type = torch.device(device).type
+        
+        # Compiled forward used for training and validation; self.model stays
+        # the plain module so checkpoints keep their usual state_dict keys
+        use_cuda = self.device_type == 'cuda'
+        if compile_model and use_cuda and hasattr(torch, 'compile'):
+            self.forward_model = torch.compile(self.model, mode='reduce-overhead')
+        else:
+            self.forward_model = self.model
+        
+        # BF16 autocast on GPUs that support it (no loss scaling needed)
+        self.amp_dtype = torch.bfloat16 if use_cuda and torch.cuda.is_bf16_supported() else None
         self.grad_clip = grad_clip
         self.warmup_steps = warmup_steps
+        self.accum_steps = accum_steps
+        # Overrides for the DataLoader defaults chosen in _make_loader
+        self.dataloader_kwargs = dataloader_kwargs or {}
         self.step = 0
         
-        # Advanced optimizer with weight decay
+        # Advanced optimizer with weight decay; the fused CUDA kernel updates
+        # all parameters at once, elsewhere the multi-tensor path does
+        fused_kwargs = {'fused': True} if use_cuda else {'foreach': True}
         self.optimizer = torch.optim.AdamW(
             model.parameters(), 
             lr=lr, 
             weight_decay=weight_decay,
-            betas=(0.9, 0.95)
+            betas=(0.9, 0.95),
+            **fused_kwargs
         )
         
         # Learning rate scheduler
@@ -34,27 +53,43 @@ class AizaTrainer:
             T_max=10000
         )
         
+    def _autocast(self):
+        """Mixed-precision context for forward passes (no-op without AMP)"""
+        return torch.autocast(device_type=self.device_type, dtype=self.amp_dtype,
+                              enabled=self.amp_dtype is not None)
+    
     def train_epoch(self, dataloader):
         self.model.train()
         total_loss = 0
         
-        for batch in tqdm(dataloader, desc="Training"):
-            x, y = batch
-            x, y = x.to(self.device), y.to(self.device)
+        # Gradients are averaged over accum_steps micro-batches per optimizer step
+        accum_steps = self.accum_steps
+        num_batches = len(dataloader)
+        self.optimizer.zero_grad(set_to_none=True)
+        
+        for i, batch in enumerate(tqdm(dataloader, desc="Training")):
+            x, y = self._to_device(batch)
             
             # Forward pass
-            logits = self.model(x)
-            loss = nn.functional.cross_entropy(logits.view(-1, logits.size(-1)), y.view(-1))
+            with self._autocast():
+                logits = self.forward_model(x)
+                loss = nn.functional.cross_entropy(logits.transpose(1, 2), y)
+            
+            # Backward pass; a trailing partial group averages over the
+            # micro-batches it actually has
+            group_start = i - i % accum_steps
+            (loss / min(accum_steps, num_batches - group_start)).backward()
+            total_loss += loss.item()
             
-            # Backward pass
-            self.optimizer.zero_grad()
-            loss.backward()
+            if (i + 1) % accum_steps != 0 and i + 1 != num_batches:
+                continue
             
             # Gradient clipping
             if self.grad_clip > 0:
-                torch.nn.utils.clip_grad_norm_(self.model.parameters(), self.grad_clip)
+                torch.nn.utils.clip_grad_norm_(self.model.parameters(), self.grad_clip, foreach=True)
             
             self.optimizer.step()
+            self.optimizer.zero_grad(set_to_none=True)
             
             # Learning rate warmup
             if self.step < self.warmup_steps:
@@ -65,27 +100,54 @@ class AizaTrainer:
                 self.scheduler.step()
             
             self.step += 1
-            total_loss += loss.item()
         
-        return total_loss / len(dataloader)
+        return total_loss / num_batches
     
-    @torch.no_grad()
+    @torch.inference_mode()
     def validate(self, dataloader):
         self.model.eval()
         total_loss = 0
         
         for batch in dataloader:
-            x, y = batch
-            x, y = x.to(self.device), y.to(self.device)
+            x, y = self._to_device(batch)
             
-            logits = self.model(x)
-            loss = nn.functional.cross_entropy(logits.view(-1, logits.size(-1)), y.view(-1))
+            with self._autocast():
+                logits = self.forward_model(x)
+                loss = nn.functional.cross_entropy(logits.transpose(1, 2), y)
             total_loss += loss.item()
         
         return total_loss / len(dataloader)
     
+    def _to_device(self, batch):
+        """Move a batch to the device as (inputs, int64 targets)"""
+        # Batches may carry int32 ids; the embedding takes them as-is and
+        # cross_entropy gets int64 targets widened after the copy
+        x, y = batch
+        if y.dim() == 1:
+            # (token rows, lengths): rows cross to the device once and are
+            # shifted there. Inputs from each sample's last token on are
+            # blanked, so padding never sees a real token paired with a pad target
+            tokens = x.to(self.device, non_blocking=True)
+            lengths = y.to(self.device, non_blocking=True)
+            inputs = tokens[:, :-1]
+            positions = torch.arange(inputs.size(1), device=inputs.device)
+            inputs = inputs.masked_fill(positions >= lengths[:, None] - 1, 0)
+            return inputs, tokens[:, 1:].long()
+        return x.to(self.device, non_blocking=True), y.to(self.device, non_blocking=True).long()
+    
+    def _make_loader(self, dataset, batch_size, shuffle=False):
+        """DataLoader that prepares batches in background workers"""
+        # Workers persist across epochs; pinned batches allow async H2D copies
+        num_workers = (os.cpu_count() or 1) // 2
+        kwargs = {'num_workers': num_workers, 'pin_memory': self.device_type == 'cuda'}
+        if num_workers > 0:
+            kwargs.update(persistent_workers=True, prefetch_factor=4)
+        kwargs.update(self.dataloader_kwargs)
+        return DataLoader(dataset, batch_size=batch_size, shuffle=shuffle, **kwargs)
+    
     def train(self, num_epochs, batch_size=32, save_every=1):
-        train_loader = DataLoader(self.train_data, batch_size=batch_size, shuffle=True)
+        train_loader = self._make_loader(self.train_data, batch_size, shuffle=True)
+        val_loader = self._make_loader(self.val_data, batch_size) if self.val_data else None
         best_val_loss = float('inf')
         
         for epoch in range(num_epochs):
@@ -94,7 +156,6 @@ class AizaTrainer:
             print(f"Epoch {epoch + 1}/{num_epochs} - Train Loss: {train_loss:.4f} - LR: {current_lr:.6f}")
             
             if self.val_data:
-                val_loader = DataLoader(self.val_data, batch_size=batch_size)
                 val_loss = self.validate(val_loader)
                 print(f"Validation Loss: {val_loss:.4f}")
                 
@@ -115,6 +176,8 @@ class AizaTrainer:
         }, path)
     
     def load_checkpoint(self, path):
-        checkpoint = torch.load(path)
+        # Map the file instead of reading it whole; state dicts hold only
+        # tensors and plain containers, so the safe unpickler suffices
+        checkpoint = torch.load(path, map_location=self.device, mmap=True, weights_only=True)
         self.model.load_state_dict(checkpoint['model_state_dict'])
         self.optimizer.load_state_dict(checkpoint['optimizer_state_dict'])
@@ -0,0 +1,30 @@
+"""
+Gunicorn settings for serving the Aiza APIs with multiple workers
+
+    gunicorn -c gunicorn_conf.py scripts.chat_web:app
+    gunicorn -c gunicorn_conf.py scripts.complete_api:app
+"""
+import os
+import torch
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+
+if torch.cuda.is_available():
+    # A CUDA context can't survive fork and every worker would hold its own
+    # copy of the weights, so one process owns the GPU; /generate already
+    # batches concurrent prompts within it
+    workers = int(os.environ.get("WORKERS", 1))
+    preload_app = False
+else:
+    # Load the app (and model) once in the master; forked workers share the
+    # weights copy-on-write instead of each loading their own
+    workers = int(os.environ.get("WORKERS", max(2, os.cpu_count() or 1)))
+    preload_app = True
+    os.environ.setdefault("AIZA_PRELOAD_MODEL", "1")
+
+
+def post_fork(server, worker):
+    # Split the cores between workers so their torch thread pools don't
+    # oversubscribe the CPU
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // server.cfg.workers))
@@ -1,247 +1,359 @@
 """
 Web interface for Aiza with finance tools
 """
+import asyncio
+import os
+from contextlib import asynccontextmanager
+import numpy as np
 import torch
 import json
 import re
+from collections import OrderedDict
+from typing import Dict, List
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from aiza.model import AizaModel
+from aiza.model import AizaModel, quantize_int8
 from aiza.tokenizer import AizaTokenizer
 from aiza.finance_tools import FinanceCalculator, BudgetAnalyzer
+from aiza.realtime_api import router as realtime_router
+from aiza.web import ORJSONResponse
 import uvicorn
 
 
-app = FastAPI()
-
-# Load model and tokenizer
+@asynccontextmanager
+async def lifespan(app):
+    # Load in the background so the server is live (and /readyz reports 503)
+    # while the model loads; a preloading master has already loaded it
+    if not MODEL_READY:
+        asyncio.get_running_loop().run_in_executor(None, load_model)
+    yield
+
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+# Compress larger JSON bodies (news, overviews, transaction lists); small ones
+# aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+
+# Chat page and other assets, served straight from disk
+static_files = StaticFiles(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'))
+app.mount("/static", static_files, name="static")
+
+# Numbers mentioned in a prompt
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+
+# Canned answers by keyword, in priority order
+_FALLBACK_RESPONSES = {
+    "budget": "A good budget follows the 50/30/20 rule: 50% for needs, 30% for wants, and 20% for savings. Track your expenses and adjust as needed!",
+    "save": "Start by automating your savings - pay yourself first! Aim to save at least 20% of your income. Build an emergency fund of 3-6 months expenses.",
+    "invest": "Before investing, have an emergency fund and pay off high-interest debt. Start with low-cost index funds and think long-term (10+ years).",
+    "debt": "Pay off high-interest debt first (avalanche method) or smallest debt first (snowball method). Pay more than the minimum whenever possible!",
+    "expense": "Track expenses by category: housing, food, transport, utilities, entertainment. Review monthly and cut unnecessary spending."
+}
+
+# Every keyword /generate looks for, matched case-insensitively in one scan
+# of the raw prompt. One group per keyword inside a lookahead, so every
+# occurrence is reported and a match's lastindex points at its keyword
+_KEYWORDS = ('calculate', 'goal') + tuple(_FALLBACK_RESPONSES)
+_KEYWORD_RE = re.compile('(?=' + '|'.join(f'({re.escape(k)})' for k in _KEYWORDS) + ')', re.IGNORECASE)
+
+# Model and tokenizer, preferring the pre-quantized INT8 checkpoint on CPU
+INT8_CHECKPOINT = 'aiza_model.int8.pt'
 device = 'cuda' if torch.cuda.is_available() else 'cpu'
 tokenizer = AizaTokenizer()
-try:
-    tokenizer.load('tokenizer.json')
-    model = AizaModel(vocab_size=tokenizer.vocab_size)
-    checkpoint = torch.load('aiza_model.pt', map_location=device)
-    model.load_state_dict(checkpoint['model_state_dict'])
-    model = model.to(device)
-    model.eval()
-    MODEL_LOADED = True
-except:
-    MODEL_LOADED = False
-    print("⚠️  Model not loaded - using finance tools only mode")
+model = None
+MODEL_LOADED = False
+# Set once loading has finished, whether or not a model was found
+MODEL_READY = False
+
+
+def load_model():
+    """Load the tokenizer and model and warm the model up"""
+    global model, MODEL_LOADED, MODEL_READY
+    if MODEL_READY:
+        return
+    try:
+        tokenizer.load('tokenizer.json')
+        if device == 'cpu' and os.path.exists(INT8_CHECKPOINT):
+            # Dynamic int8 Linears only run on CPU; rebuild the quantized layout
+            # and fill it from the checkpoint written by quantize_model.py
+            model = quantize_int8(AizaModel(vocab_size=tokenizer.vocab_size))
+            checkpoint = torch.load(INT8_CHECKPOINT, map_location=device)
+            model.load_state_dict(checkpoint['model_state_dict'])
+        else:
+            # Build on the meta device and adopt the checkpoint tensors in place, so
+            # weights are never allocated twice; mmap pages the file in lazily
+            with torch.device('meta'):
+                model = AizaModel(vocab_size=tokenizer.vocab_size)
+            checkpoint = torch.load('aiza_model.pt', map_location=device, mmap=True, weights_only=True)
+            model.load_state_dict(checkpoint['model_state_dict'], assign=True)
+        model.eval()
+        if device == 'cuda':
+            # Serve half-precision weights (bf16 where supported) on tensor cores
+            torch.backends.cudnn.benchmark = True
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+            model.to(torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16)
+            # Fuse the forward pass; shapes change every decode step, so compile
+            # dynamically instead of specializing on each sequence length
+            model.forward = torch.compile(model.forward, dynamic=True)
+        _warm_up()
+        MODEL_LOADED = True
+    except:
+        print("⚠️  Model not loaded - using finance tools only mode")
+    MODEL_READY = True
+
+
+def _warm_up():
+    """Warm up the model before it serves requests"""
+    # Compilation and kernel selection happen here instead of on the first
+    # request, covering both the single and the padded batch paths
+    with torch.inference_mode():
+        for _ in range(3):
+            model.generate(torch.zeros((1, 8), dtype=torch.long, device=device), max_new_tokens=4)
+            model.generate(torch.zeros((2, 8), dtype=torch.long, device=device), max_new_tokens=4,
+                           prompt_lengths=[8, 4])
+
+
+# gunicorn_conf.py sets this in a preloading master, so forked workers share
+# the loaded weights copy-on-write
+if os.environ.get('AIZA_PRELOAD_MODEL') == '1':
+    load_model()
 
 # Initialize finance tools
 calc = FinanceCalculator()
 analyzer = BudgetAnalyzer()
 
 
-@app.get("/", response_class=HTMLResponse)
-async def home():
-    return """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Aiza - BudgetPay Finance Assistant</title>
-        <style>
-            * { margin: 0; padding: 0; box-sizing: border-box; }
-            body {
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                height: 100vh;
-                display: flex;
-                justify-content: center;
-                align-items: center;
-            }
-            .container {
-                width: 90%;
-                max-width: 800px;
-                height: 90vh;
-                background: white;
-                border-radius: 20px;
-                box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-                display: flex;
-                flex-direction: column;
-            }
-            .header {
-                padding: 20px;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                border-radius: 20px 20px 0 0;
-                text-align: center;
-            }
-            .header h1 { font-size: 28px; margin-bottom: 5px; }
-            .header p { font-size: 14px; opacity: 0.9; }
-            .chat-area {
-                flex: 1;
-                padding: 20px;
-                overflow-y: auto;
-                background: #f7f7f7;
-            }
-            .message {
-                margin-bottom: 15px;
-                padding: 12px 16px;
-                border-radius: 12px;
-                max-width: 80%;
-                animation: fadeIn 0.3s;
-            }
-            @keyframes fadeIn {
-                from { opacity: 0; transform: translateY(10px); }
-                to { opacity: 1; transform: translateY(0); }
-            }
-            .user-message {
-                background: #667eea;
-                color: white;
-                margin-left: auto;
-                text-align: right;
-            }
-            .ai-message {
-                background: white;
-                color: #333;
-                border: 1px solid #e0e0e0;
-            }
-            .input-area {
-                padding: 20px;
-                background: white;
-                border-radius: 0 0 20px 20px;
-                border-top: 1px solid #e0e0e0;
-            }
-            .input-group {
-                display: flex;
-                gap: 10px;
-            }
-            input {
-                flex: 1;
-                padding: 12px 16px;
-                border: 2px solid #e0e0e0;
-                border-radius: 25px;
-                font-size: 14px;
-                outline: none;
-                transition: border-color 0.3s;
-            }
-            input:focus { border-color: #667eea; }
-            button {
-                padding: 12px 30px;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                border: none;
-                border-radius: 25px;
-                cursor: pointer;
-                font-size: 14px;
-                font-weight: 600;
-                transition: transform 0.2s;
-            }
-            button:hover { transform: scale(1.05); }
-            button:active { transform: scale(0.95); }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>💰 Aiza</h1>
-                <p>Your BudgetPay Finance Assistant</p>
-            </div>
-            <div class="chat-area" id="chatArea">
-                <div class="message ai-message">
-                    Hello! I'm Aiza, your finance assistant. How can I help you with your budget today?
-                </div>
-            </div>
-            <div class="input-area">
-                <div class="input-group">
-                    <input type="text" id="userInput" placeholder="Ask me about budgeting, saving, or investing..." />
-                    <button onclick="sendMessage()">Send</button>
-                </div>
-            </div>
-        </div>
+# Request bodies, parsed and validated by pydantic-core in one pass
+class GenerateReq(BaseModel):
+    prompt: str = ''
+
+
+class BudgetReq(BaseModel):
+    income: float = 0
+    expenses: Dict[str, float] = {}
+
+
+class SavingsGoalReq(BaseModel):
+    target: float = 0
+    current: float = 0
+    monthly_save: float = 0
+
+
+class TransactionsReq(BaseModel):
+    transactions: List[Dict] = []
+
+
+class DebtPayoffReq(BaseModel):
+    balance: float = 0
+    interest_rate: float = 0
+    monthly_payment: float = 0
+
+
+class CompoundInterestReq(BaseModel):
+    principal: float = 0
+    rate: float = 0
+    years: int = 0
+
+
+# Concurrent /generate requests are coalesced into one batched generate call
+GENERATE_MAX_NEW_TOKENS = 100
+GENERATE_TEMPERATURE = 0.8
+GENERATE_BATCH_SIZE = 8
+GENERATE_BATCH_WINDOW = 0.01  # seconds to wait for more prompts
+_generate_queue = None
+
+# Responses by normalized prompt, least recently used first
+GENERATE_CACHE_SIZE = 4096
+_WHITESPACE_RE = re.compile(r'\s+')
+_generate_cache = OrderedDict()
+
+# Prompt id buffers reused across batches: rows are written into a (pinned)
+# host staging buffer and uploaded asynchronously into a device buffer,
+# instead of building and synchronously copying a fresh tensor per batch
+_ids_staging = None
+_ids_buf = None
+
+
+def _batch_input_ids(rows):
+    """Stage equal-width token rows and return them as a device tensor view"""
+    global _ids_staging, _ids_buf
+    if _ids_buf is None:
+        shape = (GENERATE_BATCH_SIZE, model.max_seq_len)
+        _ids_staging = torch.zeros(shape, dtype=torch.long, pin_memory=device == 'cuda')
+        _ids_buf = _ids_staging if device == 'cpu' else torch.empty(shape, dtype=torch.long, device=device)
+    
+    staging = _ids_staging[:len(rows), :len(rows[0])]
+    staging.numpy()[:] = rows
+    if _ids_buf is _ids_staging:
+        return staging
+    input_ids = _ids_buf[:len(rows), :len(rows[0])]
+    input_ids.copy_(staging, non_blocking=True)
+    return input_ids
+
+
+@torch.inference_mode()
+def _generate_batch(prompts):
+    """Generate completions for several prompts, batching those that fit"""
+    encoded = [tokenizer.encode(p) for p in prompts]
+    outputs = [None] * len(prompts)
+    
+    # Prompts whose output would overflow the context run alone on the
+    # model's sliding-window path
+    limit = model.max_seq_len - GENERATE_MAX_NEW_TOKENS
+    batched = [i for i, tokens in enumerate(encoded) if len(tokens) <= limit]
+    for i, tokens in enumerate(encoded):
+        if len(tokens) > limit:
+            input_ids = torch.tensor([tokens], dtype=torch.long, device=device)
+            output_ids = model.generate(input_ids, GENERATE_MAX_NEW_TOKENS, GENERATE_TEMPERATURE)
+            outputs[i] = tokenizer.decode(output_ids[0].tolist())
+    
+    if batched:
+        # Left-pad so every prompt ends at the same column
+        lengths = [len(encoded[i]) for i in batched]
+        width = max(lengths)
+        rows = [[0] * (width - len(encoded[i])) + encoded[i] for i in batched]
+        input_ids = _batch_input_ids(rows)
+        output_ids = model.generate(input_ids, GENERATE_MAX_NEW_TOKENS, GENERATE_TEMPERATURE,
+                                    prompt_lengths=lengths)
+        for i, length, row in zip(batched, lengths, output_ids.tolist()):
+            outputs[i] = tokenizer.decode(row[width - length:])
+    return outputs
+
+
+async def _generate_worker(queue):
+    """Collect queued prompts into batches and run them off the event loop"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + GENERATE_BATCH_WINDOW
+        while len(batch) < GENERATE_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
         
-        <script>
-            async function sendMessage() {
-                const input = document.getElementById('userInput');
-                const message = input.value.trim();
-                if (!message) return;
-                
-                const chatArea = document.getElementById('chatArea');
-                chatArea.innerHTML += `<div class="message user-message">${message}</div>`;
-                input.value = '';
-                chatArea.scrollTop = chatArea.scrollHeight;
-                
-                const response = await fetch('/generate', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ prompt: message })
-                });
-                
-                const data = await response.json();
-                chatArea.innerHTML += `<div class="message ai-message">${data.response}</div>`;
-                chatArea.scrollTop = chatArea.scrollHeight;
-            }
-            
-            document.getElementById('userInput').addEventListener('keypress', (e) => {
-                if (e.key === 'Enter') sendMessage();
-            });
-        </script>
-    </body>
-    </html>
-    """
+        try:
+            texts = await loop.run_in_executor(None, _generate_batch, [prompt for prompt, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), text in zip(batch, texts):
+                if not future.done():
+                    future.set_result(text)
+
+
+async def generate_text(prompt):
+    """Generate a completion, sharing a batch with concurrent requests"""
+    global _generate_queue
+    # Repeated prompts reuse the earlier (or still running) generation
+    key = _WHITESPACE_RE.sub(' ', prompt.strip().lower())
+    future = _generate_cache.get(key)
+    if future is not None:
+        _generate_cache.move_to_end(key)
+        return await asyncio.shield(future)
+    
+    loop = asyncio.get_running_loop()
+    if _generate_queue is None:
+        _generate_queue = asyncio.Queue()
+        loop.create_task(_generate_worker(_generate_queue))
+    future = loop.create_future()
+    _generate_cache[key] = future
+    if len(_generate_cache) > GENERATE_CACHE_SIZE:
+        _generate_cache.popitem(last=False)
+    await _generate_queue.put((key, future))
+    try:
+        return await asyncio.shield(future)
+    except Exception:
+        # Don't keep failures around for later requests
+        if _generate_cache.get(key) is future:
+            del _generate_cache[key]
+        raise
+
+
+@app.get("/", response_class=HTMLResponse)
+async def home(request: Request):
+    # Served from disk with ETag/Last-Modified, so repeat visits get a 304
+    response = await static_files.get_response("index.html", request.scope)
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return response
 
 
 @app.post("/generate")
-async def generate(request: Request):
-    data = await request.json()
-    prompt = data.get('prompt', '').lower()
+async def generate(req: GenerateReq):
+    prompt = req.prompt
+    found = {_KEYWORDS[m.lastindex - 1] for m in _KEYWORD_RE.finditer(prompt)}
     
-    # Check if it's a finance calculation request
-    if 'calculate' in prompt or 'budget' in prompt or 'expense' in prompt:
-        # Try to extract numbers and calculate
-        numbers = re.findall(r'\d+(?:\.\d+)?', prompt)
-        if len(numbers) >= 2:
-            try:
-                income = float(numbers[0])
-                expenses = {"total": sum(float(n) for n in numbers[1:])}
-                result = calc.calculate_budget(income, expenses)
-                response = f"Based on income ${income:.0f} and expenses ${result['total_expenses']:.0f}, you have ${result['savings']:.0f} in savings ({result['savings_rate']} savings rate). Status: {result['status']}."
-                return {"response": response, "calculation": result}
-            except:
-                pass
+    is_budget = 'calculate' in found or 'budget' in found or 'expense' in found
+    is_goal = 'save' in found or 'goal' in found
     
-    # Check for savings goal
-    if 'save' in prompt or 'goal' in prompt:
-        numbers = re.findall(r'\d+(?:\.\d+)?', prompt)
-        if len(numbers) >= 3:
-            try:
-                target, current, monthly = float(numbers[0]), float(numbers[1]), float(numbers[2])
-                result = calc.savings_goal(target, current, monthly)
-                response = f"To reach your ${target:.0f} goal from ${current:.0f}, saving ${monthly:.0f}/month, it will take {result['time_estimate']}."
-                return {"response": response, "calculation": result}
-            except:
-                pass
+    # Numbers for either calculation, scanned and parsed once
+    numbers = np.array(_NUMBER_RE.findall(prompt) if is_budget or is_goal else [], dtype=np.float64)
+    
+    # Check if it's a finance calculation request; the regex only matches
+    # plain decimals, so the numbers are always valid floats
+    if is_budget and len(numbers) >= 2:
+        income = float(numbers[0])
+        expenses = {"total": float(numbers[1:].sum())}
+        result = calc.calculate_budget(income, expenses)
+        response = f"Based on income ${income:.0f} and expenses ${result['total_expenses']:.0f}, you have ${result['savings']:.0f} in savings ({result['savings_rate']} savings rate). Status: {result['status']}."
+        return {"response": response, "calculation": result}
+    
+    # Check for savings goal; a reached goal or non-positive saving has no
+    # time estimate and falls through to the model
+    if is_goal and len(numbers) >= 3:
+        target, current, monthly = numbers[:3].tolist()
+        result = calc.savings_goal(target, current, monthly)
+        if result['status'] == 'on_track':
+            response = f"To reach your ${target:.0f} goal from ${current:.0f}, saving ${monthly:.0f}/month, it will take {result['time_estimate']}."
+            return {"response": response, "calculation": result}
     
     # Use AI model if loaded
     if MODEL_LOADED:
         try:
-            tokens = tokenizer.encode(prompt)
-            input_ids = torch.tensor([tokens], dtype=torch.long).to(device)
-            output_ids = model.generate(input_ids, max_new_tokens=100, temperature=0.8)
-            response = tokenizer.decode(output_ids[0].tolist())
+            response = await generate_text(prompt)
             return {"response": response}
         except Exception as e:
             return {"response": f"Error generating response: {str(e)}"}
     
-    # Fallback responses
-    fallback_responses = {
-        "budget": "A good budget follows the 50/30/20 rule: 50% for needs, 30% for wants, and 20% for savings. Track your expenses and adjust as needed!",
-        "save": "Start by automating your savings - pay yourself first! Aim to save at least 20% of your income. Build an emergency fund of 3-6 months expenses.",
-        "invest": "Before investing, have an emergency fund and pay off high-interest debt. Start with low-cost index funds and think long-term (10+ years).",
-        "debt": "Pay off high-interest debt first (avalanche method) or smallest debt first (snowball method). Pay more than the minimum whenever possible!",
-        "expense": "Track expenses by category: housing, food, transport, utilities, entertainment. Review monthly and cut unnecessary spending."
-    }
-    
-    for keyword, response in fallback_responses.items():
-        if keyword in prompt:
-            return {"response": response}
+    # Fallback responses: earliest-listed keyword in the prompt wins
+    for keyword, answer in _FALLBACK_RESPONSES.items():
+        if keyword in found:
+            return {"response": answer}
     
     return {"response": "I'm Aiza, your finance assistant! Ask me about budgeting, saving, investing, or debt management. I can also help calculate budgets and savings goals!"}
 
 
+@app.post("/generate/stream")
+def generate_stream(req: GenerateReq):
+    """Stream the model's completion token by token as it is generated"""
+    if not MODEL_LOADED:
+        return ORJSONResponse({"response": "Model not loaded"}, status_code=503)
+    
+    prompt = _WHITESPACE_RE.sub(' ', req.prompt.strip().lower())
+    tokens = tokenizer.encode(prompt)
+    
+    @torch.inference_mode()
+    def token_ids():
+        yield from tokens
+        input_ids = torch.tensor([tokens], dtype=torch.long, device=device)
+        for idx_next in model.generate_stream(input_ids, GENERATE_MAX_NEW_TOKENS, GENERATE_TEMPERATURE):
+            yield idx_next.item()
+    
+    # Starlette pulls each chunk in its threadpool, so sampling never blocks the
+    # event loop; the identity encoding keeps gzip from buffering the stream
+    return StreamingResponse(tokenizer.decode_stream(token_ids()), media_type="text/plain",
+                             headers={"Content-Encoding": "identity"})
+
+
 if __name__ == '__main__':
     print("Starting Aiza web interface...")
     print("Visit http://localhost:8000")
@@ -249,71 +361,60 @@ if __name__ == '__main__':
 
 
 @app.post("/api/budget")
-async def calculate_budget_api(request: Request):
+async def calculate_budget_api(req: BudgetReq):
     """Calculate budget breakdown"""
-    data = await request.json()
-    income = data.get('income', 0)
-    expenses = data.get('expenses', {})
+    income = req.income
+    expenses = req.expenses
     
     result = calc.calculate_budget(income, expenses)
     recommendations = analyzer.get_recommendations(income, expenses)
     
-    return JSONResponse({
+    return ORJSONResponse({
         "budget": result,
         "recommendations": recommendations
     })
 
 
 @app.post("/api/savings_goal")
-async def savings_goal_api(request: Request):
+async def savings_goal_api(req: SavingsGoalReq):
     """Calculate savings goal timeline"""
-    data = await request.json()
-    target = data.get('target', 0)
-    current = data.get('current', 0)
-    monthly_save = data.get('monthly_save', 0)
-    
-    result = calc.savings_goal(target, current, monthly_save)
-    return JSONResponse(result)
+    result = calc.savings_goal(req.target, req.current, req.monthly_save)
+    return ORJSONResponse(result)
 
 
 @app.post("/api/expense_analyze")
-async def analyze_expenses_api(request: Request):
+async def analyze_expenses_api(req: TransactionsReq):
     """Analyze spending patterns"""
-    data = await request.json()
-    transactions = data.get('transactions', [])
-    
-    result = calc.analyze_spending(transactions)
-    return JSONResponse(result)
+    result = calc.analyze_spending(req.transactions)
+    return ORJSONResponse(result)
 
 
 @app.post("/api/debt_payoff")
-async def debt_payoff_api(request: Request):
+async def debt_payoff_api(req: DebtPayoffReq):
     """Calculate debt payoff timeline"""
-    data = await request.json()
-    balance = data.get('balance', 0)
-    interest_rate = data.get('interest_rate', 0)
-    monthly_payment = data.get('monthly_payment', 0)
-    
-    result = calc.debt_payoff(balance, interest_rate, monthly_payment)
-    return JSONResponse(result)
+    result = calc.debt_payoff(req.balance, req.interest_rate, req.monthly_payment)
+    return ORJSONResponse(result)
 
 
 @app.post("/api/compound_interest")
-async def compound_interest_api(request: Request):
+async def compound_interest_api(req: CompoundInterestReq):
     """Calculate compound interest"""
-    data = await request.json()
-    principal = data.get('principal', 0)
-    rate = data.get('rate', 0)
-    years = data.get('years', 0)
-    
-    result = calc.compound_interest(principal, rate, years)
-    return JSONResponse(result)
+    result = calc.compound_interest(req.principal, req.rate, req.years)
+    return ORJSONResponse(result)
+
+
+@app.get("/readyz")
+async def readiness_check():
+    """Readiness probe: 503 until model loading has finished"""
+    if not MODEL_READY:
+        return ORJSONResponse({"status": "loading"}, status_code=503)
+    return ORJSONResponse({"status": "ready", "model_loaded": MODEL_LOADED})
 
 
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
-    return JSONResponse({
+    return ORJSONResponse({
         "status": "healthy",
         "model_loaded": MODEL_LOADED,
         "device": device,
@@ -322,117 +423,4 @@ async def health_check():
 
 
 # Real-time data integrations
-from aiza.realtime_data import RealTimeDataHub
-
-# Initialize real-time data hub
-realtime_hub = RealTimeDataHub()
-
-
-@app.get("/api/stock/{symbol}")
-async def get_stock_price(symbol: str):
-    """Get current stock price"""
-    result = realtime_hub.stocks.get_stock_price(symbol.upper())
-    return JSONResponse(result)
-
-
-@app.get("/api/stock/{symbol}/history")
-async def get_stock_history(symbol: str, days: int = 30):
-    """Get stock price history"""
-    result = realtime_hub.stocks.get_stock_history(symbol.upper(), days)
-    return JSONResponse(result)
-
-
-@app.get("/api/stock/search/{keywords}")
-async def search_stocks(keywords: str):
-    """Search for stocks"""
-    results = realtime_hub.stocks.search_stocks(keywords)
-    return JSONResponse({"results": results})
-
-
-@app.get("/api/currency/{from_curr}/{to_curr}")
-async def get_exchange_rate(from_curr: str, to_curr: str):
-    """Get currency exchange rate"""
-    result = realtime_hub.currency.get_exchange_rate(from_curr, to_curr)
-    return JSONResponse(result)
-
-
-@app.post("/api/currency/convert")
-async def convert_currency(request: Request):
-    """Convert currency amount"""
-    data = await request.json()
-    amount = data.get('amount', 0)
-    from_curr = data.get('from', 'USD')
-    to_curr = data.get('to', 'EUR')
-    
-    result = realtime_hub.currency.convert_currency(amount, from_curr, to_curr)
-    return JSONResponse(result)
-
-
-@app.get("/api/currency/rates/{base}")
-async def get_all_rates(base: str = "USD"):
-    """Get all exchange rates for base currency"""
-    result = realtime_hub.currency.get_all_rates(base)
-    return JSONResponse(result)
-
-
-@app.get("/api/rates/federal")
-async def get_federal_rate():
-    """Get Federal Funds Rate"""
-    result = realtime_hub.interest.get_federal_funds_rate()
-    return JSONResponse(result)
-
-
-@app.get("/api/rates/mortgage")
-async def get_mortgage_rates():
-    """Get current mortgage rates"""
-    result = realtime_hub.interest.get_mortgage_rates()
-    return JSONResponse(result)
-
-
-@app.get("/api/rates/savings")
-async def get_savings_rates():
-    """Get savings account rates"""
-    result = realtime_hub.interest.get_savings_rates()
-    return JSONResponse(result)
-
-
-@app.get("/api/rates/inflation")
-async def get_inflation():
-    """Get current inflation rate"""
-    result = realtime_hub.interest.get_inflation_rate()
-    return JSONResponse(result)
-
-
-@app.get("/api/news/market")
-async def get_market_news(limit: int = 10):
-    """Get latest market news"""
-    news = realtime_hub.news.get_market_news(limit)
-    return JSONResponse({"news": news})
-
-
-@app.get("/api/news/search/{query}")
-async def search_news(query: str, limit: int = 5):
-    """Search financial news"""
-    news = realtime_hub.news.search_news(query, limit)
-    return JSONResponse({"news": news})
-
-
-@app.get("/api/bank/accounts")
-async def get_bank_accounts(access_token: str = "demo"):
-    """Get user's bank accounts"""
-    result = realtime_hub.bank.get_accounts(access_token)
-    return JSONResponse(result)
-
-
-@app.get("/api/bank/transactions")
-async def get_transactions(access_token: str = "demo", days: int = 30):
-    """Get recent transactions"""
-    result = realtime_hub.bank.get_transactions(access_token, days)
-    return JSONResponse(result)
-
-
-@app.get("/api/market/overview")
-async def get_market_overview():
-    """Get comprehensive market overview"""
-    result = realtime_hub.get_market_overview()
-    return JSONResponse(result)
+app.include_router(realtime_router)
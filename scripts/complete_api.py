@@ -2,8 +2,11 @@
 Complete API with all BudgetPay AI features
 Run this for full functionality
 """
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, HTMLResponse
+from typing import Dict, List
+from fastapi import FastAPI
+from pydantic import BaseModel, Field
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse
 import uvicorn
 
 # Import all modules
@@ -14,9 +17,14 @@ from budgetpayai.investments import PortfolioAnalyzer, SIPRecommender, RiskProfi
 from budgetpayai.security import FraudDetector
 from budgetpayai.automation import AutoInvestmentManager, AutoBillPayManager, SalaryDistributor, TaxPlanner
 from budgetpayai.finance_tools import FinanceCalculator, BudgetAnalyzer
-from budgetpayai.realtime_data import RealTimeDataHub
+from budgetpayai.realtime_api import router as realtime_router
+from budgetpayai.web import ORJSONResponse
 
-app = FastAPI(title="BudgetPay AI - Complete API")
+
+app = FastAPI(title="BudgetPay AI - Complete API", default_response_class=ORJSONResponse)
+# Compress larger JSON bodies (news, overviews, transaction lists); small ones
+# aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
 
 # Initialize all systems
 transaction_detector = SmartTransactionDetector()
@@ -37,7 +45,6 @@ salary_distributor = SalaryDistributor()
 tax_planner = TaxPlanner()
 calc = FinanceCalculator()
 analyzer = BudgetAnalyzer()
-realtime_hub = RealTimeDataHub()
 
 
 @app.get("/")
@@ -76,148 +83,214 @@ async def home():
     """)
 
 
+# REQUEST BODIES
+# Typed bodies are parsed and validated by pydantic-core in one pass
+class SMSReq(BaseModel):
+    message: str = ''
+
+
+class ReceiptReq(BaseModel):
+    ocr_text: str = ''
+
+
+class HistoryReq(BaseModel):
+    historical: List[Dict] = []
+
+
+class BalanceReq(BaseModel):
+    balance: float = 0
+    days: int = 15
+    daily_avg: float = 200
+
+
+class TransactionsReq(BaseModel):
+    transactions: List[Dict] = []
+
+
+class MonthReq(BaseModel):
+    month_data: Dict = {}
+
+
+class AlertsReq(BaseModel):
+    spending: Dict = {}
+    budgets: Dict = {}
+    profile: Dict = {}
+
+
+class HoldingsReq(BaseModel):
+    holdings: List[Dict] = []
+
+
+class ProfileReq(BaseModel):
+    profile: Dict = {}
+
+
+class SIPReturnsReq(BaseModel):
+    amount: float = 5000
+    years: int = 10
+    expected_return: float = Field(12, alias='return')
+
+
+class RiskReq(BaseModel):
+    answers: Dict = {}
+
+
+class NetWorthReq(BaseModel):
+    assets: Dict = {}
+    liabilities: Dict = {}
+
+
+class FraudReq(BaseModel):
+    transaction: Dict = {}
+    profile: Dict = {}
+
+
+class AutoInvestReq(BaseModel):
+    user_id: str = 'user1'
+    rule: Dict = {}
+
+
+class AutoBillReq(BaseModel):
+    user_id: str = 'user1'
+    bill: Dict = {}
+
+
+class SalaryReq(BaseModel):
+    user_id: str = 'user1'
+    amount: float = 0
+
+
+class TaxReq(BaseModel):
+    income: float = 0
+    regime: str = 'new'
+
+
+class TaxSavingsReq(BaseModel):
+    income: float = 0
+    investments: Dict = {}
+
+
+class BudgetReq(BaseModel):
+    income: float = 0
+    expenses: Dict[str, float] = {}
+
+
 # SMART PARSING
 @app.post("/api/parse/sms")
-async def parse_sms(request: Request):
-    data = await request.json()
-    result = transaction_detector.process_sms(data.get('message', ''))
-    return JSONResponse(result if result else {'error': 'Could not parse'})
+async def parse_sms(req: SMSReq):
+    result = transaction_detector.process_sms(req.message)
+    return ORJSONResponse(result if result else {'error': 'Could not parse'})
 
 @app.post("/api/parse/receipt")
-async def parse_receipt(request: Request):
-    data = await request.json()
-    return JSONResponse(transaction_detector.process_receipt(data.get('ocr_text', '')))
+async def parse_receipt(req: ReceiptReq):
+    return ORJSONResponse(transaction_detector.process_receipt(req.ocr_text))
 
 # PREDICTIONS
 @app.post("/api/predict/monthly")
-async def predict_monthly(request: Request):
-    data = await request.json()
-    return JSONResponse(spending_predictor.predict_monthly_spending(data.get('historical', [])))
+async def predict_monthly(req: HistoryReq):
+    return ORJSONResponse(spending_predictor.predict_monthly_spending(req.historical))
 
 @app.post("/api/predict/balance")
-async def predict_balance(request: Request):
-    data = await request.json()
-    return JSONResponse(spending_predictor.predict_end_of_month_balance(
-        data.get('balance', 0), data.get('days', 15), data.get('daily_avg', 200)
+async def predict_balance(req: BalanceReq):
+    return ORJSONResponse(spending_predictor.predict_end_of_month_balance(
+        req.balance, req.days, req.daily_avg
     ))
 
 # BILLS & SUBSCRIPTIONS
 @app.post("/api/bills/detect")
-async def detect_bills(request: Request):
-    data = await request.json()
-    return JSONResponse({'bills': bill_reminder.detect_recurring_bills(data.get('transactions', []))})
+async def detect_bills(req: TransactionsReq):
+    return ORJSONResponse({'bills': bill_reminder.detect_recurring_bills(req.transactions)})
 
 @app.post("/api/subscriptions/detect")
-async def detect_subs(request: Request):
-    data = await request.json()
-    return JSONResponse({'subscriptions': subscription_detector.detect_subscriptions(data.get('transactions', []))})
+async def detect_subs(req: TransactionsReq):
+    return ORJSONResponse({'subscriptions': subscription_detector.detect_subscriptions(req.transactions)})
 
 # REPORTS & ALERTS
 @app.post("/api/reports/monthly")
-async def monthly_report(request: Request):
-    data = await request.json()
-    return JSONResponse(report_generator.generate_report(data.get('month_data', {})))
+async def monthly_report(req: MonthReq):
+    return ORJSONResponse(report_generator.generate_report(req.month_data))
 
 @app.post("/api/alerts/all")
-async def all_alerts(request: Request):
-    data = await request.json()
-    return JSONResponse({'alerts': alert_system.get_all_alerts(
-        data.get('spending', {}), data.get('budgets', {}), data.get('profile', {})
+async def all_alerts(req: AlertsReq):
+    return ORJSONResponse({'alerts': alert_system.get_all_alerts(
+        req.spending, req.budgets, req.profile
     )})
 
 # INVESTMENTS
 @app.post("/api/portfolio/analyze")
-async def analyze_portfolio(request: Request):
-    data = await request.json()
-    return JSONResponse(portfolio_analyzer.analyze_portfolio(data.get('holdings', [])))
+async def analyze_portfolio(req: HoldingsReq):
+    return ORJSONResponse(portfolio_analyzer.analyze_portfolio(req.holdings))
 
 @app.post("/api/sip/recommend")
-async def recommend_sip(request: Request):
-    data = await request.json()
-    return JSONResponse({'recommendations': sip_recommender.recommend_sip(data.get('profile', {}))})
+async def recommend_sip(req: ProfileReq):
+    return ORJSONResponse({'recommendations': sip_recommender.recommend_sip(req.profile)})
 
 @app.post("/api/sip/returns")
-async def sip_returns(request: Request):
-    data = await request.json()
-    return JSONResponse(sip_recommender.calculate_sip_returns(
-        data.get('amount', 5000), data.get('years', 10), data.get('return', 12)
+async def sip_returns(req: SIPReturnsReq):
+    return ORJSONResponse(sip_recommender.calculate_sip_returns(
+        req.amount, req.years, req.expected_return
     ))
 
 @app.post("/api/risk/assess")
-async def assess_risk(request: Request):
-    data = await request.json()
-    return JSONResponse(risk_profiler.assess_risk_profile(data.get('answers', {})))
+async def assess_risk(req: RiskReq):
+    return ORJSONResponse(risk_profiler.assess_risk_profile(req.answers))
 
 @app.post("/api/networth/calculate")
-async def calc_networth(request: Request):
-    data = await request.json()
-    return JSONResponse(networth_tracker.calculate_net_worth(
-        data.get('assets', {}), data.get('liabilities', {})
+async def calc_networth(req: NetWorthReq):
+    return ORJSONResponse(networth_tracker.calculate_net_worth(
+        req.assets, req.liabilities
     ))
 
 # SECURITY
 @app.post("/api/fraud/detect")
-async def detect_fraud(request: Request):
-    data = await request.json()
-    return JSONResponse(fraud_detector.detect_fraud(
-        data.get('transaction', {}), data.get('profile', {})
+async def detect_fraud(req: FraudReq):
+    return ORJSONResponse(fraud_detector.detect_fraud(
+        req.transaction, req.profile
     ))
 
 # AUTOMATION
 @app.post("/api/auto/invest")
-async def auto_invest(request: Request):
-    data = await request.json()
+async def auto_invest(req: AutoInvestReq):
     rule_id = auto_invest_manager.create_auto_investment_rule(
-        data.get('user_id', 'user1'), data.get('rule', {})
+        req.user_id, req.rule
     )
-    return JSONResponse({'rule_id': rule_id})
+    return ORJSONResponse({'rule_id': rule_id})
 
 @app.post("/api/auto/bill")
-async def auto_bill(request: Request):
-    data = await request.json()
+async def auto_bill(req: AutoBillReq):
     bill_id = auto_bill_manager.setup_auto_pay(
-        data.get('user_id', 'user1'), data.get('bill', {})
+        req.user_id, req.bill
     )
-    return JSONResponse({'bill_id': bill_id})
+    return ORJSONResponse({'bill_id': bill_id})
 
 @app.post("/api/salary/distribute")
-async def distribute(request: Request):
-    data = await request.json()
-    return JSONResponse(salary_distributor.distribute_salary(
-        data.get('user_id', 'user1'), data.get('amount', 0)
+async def distribute(req: SalaryReq):
+    return ORJSONResponse(salary_distributor.distribute_salary(
+        req.user_id, req.amount
     ))
 
 # TAX
 @app.post("/api/tax/calculate")
-async def calc_tax(request: Request):
-    data = await request.json()
-    return JSONResponse(tax_planner.calculate_tax(
-        data.get('income', 0), data.get('regime', 'new')
+async def calc_tax(req: TaxReq):
+    return ORJSONResponse(tax_planner.calculate_tax(
+        req.income, req.regime
     ))
 
 @app.post("/api/tax/savings")
-async def tax_savings(request: Request):
-    data = await request.json()
-    return JSONResponse({'suggestions': tax_planner.suggest_tax_savings(
-        data.get('income', 0), data.get('investments', {})
+async def tax_savings(req: TaxSavingsReq):
+    return ORJSONResponse({'suggestions': tax_planner.suggest_tax_savings(
+        req.income, req.investments
     )})
 
 # FINANCE TOOLS
 @app.post("/api/budget/calculate")
-async def calc_budget(request: Request):
-    data = await request.json()
-    return JSONResponse(calc.calculate_budget(
-        data.get('income', 0), data.get('expenses', {})
+async def calc_budget(req: BudgetReq):
+    return ORJSONResponse(calc.calculate_budget(
+        req.income, req.expenses
     ))
 
 # REAL-TIME DATA
-@app.get("/api/stock/{symbol}")
-async def stock_price(symbol: str):
-    return JSONResponse(realtime_hub.stocks.get_stock_price(symbol))
-
-@app.get("/api/market/overview")
-async def market_overview():
-    return JSONResponse(realtime_hub.get_market_overview())
+app.include_router(realtime_router)
 
 
 if __name__ == '__main__':
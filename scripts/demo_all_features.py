@@ -161,6 +161,18 @@ print(f"Fraud Score: {fraud_check['fraud_score']}/100")
 print(f"Risk Level: {fraud_check['risk_level'].upper()}")
 print(f"Action: {fraud_check['recommended_action'].upper()}")
 
+# Batch scoring must agree with detect_fraud, including Plaid-style list
+# categories and unparseable timestamps
+mixed_transactions = [
+    transaction,
+    {'amount': 500, 'category': 'gambling', 'timestamp': '2025-12-01T14:00:00'},
+    {'amount': 649, 'category': ['Service', 'Entertainment'], 'timestamp': 'not a date'},
+    {'amount': 9000, 'category': None},
+]
+batch_scores = fraud.detect_fraud_batch(mixed_transactions, user_profile)
+single_scores = [fraud.detect_fraud(t, user_profile)['fraud_score'] for t in mixed_transactions]
+print(f"Batch Scores Match: {'✓' if batch_scores.tolist() == single_scores else '✗'}")
+
 # 12. TAX PLANNING
 print("\n1️⃣2️⃣  TAX PLANNING")
 print("-" * 70)
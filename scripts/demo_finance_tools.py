@@ -2,7 +2,10 @@
 Demo script to showcase Aiza's finance tools
 """
 from aiza.finance_tools import FinanceCalculator, BudgetAnalyzer
+from contextlib import redirect_stdout
+import io
 import json
+import sys
 
 
 def print_section(title):
@@ -216,10 +219,15 @@ def main():
     ]
     
     for demo in demos:
+        # Collect each demo's output and write it in one go instead of
+        # hitting stdout once per print
+        buf = io.StringIO()
         try:
-            demo()
+            with redirect_stdout(buf):
+                demo()
         except Exception as e:
-            print(f"\n❌ Error in {demo.__name__}: {str(e)}")
+            buf.write(f"\n❌ Error in {demo.__name__}: {str(e)}\n")
+        sys.stdout.write(buf.getvalue())
     
     print("\n" + "=" * 60)
     print("  Demo Complete!")
@@ -20,8 +20,9 @@ def demo_stock_prices():
     
     symbols = ["AAPL", "GOOGL", "MSFT"]
     
-    for symbol in symbols:
-        result = hub.stocks.get_stock_price(symbol)
+    # Fetch all quotes concurrently, then print in order
+    quotes = hub.stocks.get_stock_prices_batch(symbols)
+    for symbol, result in quotes.items():
         if result["status"] == "success":
             print(f"{symbol}:")
             print(f"  Price: ${result['price']:.2f}")
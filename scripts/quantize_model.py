@@ -0,0 +1,29 @@
+"""
+Quantize the trained Aiza model to INT8 for CPU serving
+"""
+import os
+import torch
+from aiza.model import AizaModel, quantize_int8
+from aiza.tokenizer import AizaTokenizer
+
+
+def main():
+    tokenizer = AizaTokenizer()
+    tokenizer.load('tokenizer.json')
+    
+    # Load the FP32 checkpoint
+    model = AizaModel(vocab_size=tokenizer.vocab_size)
+    checkpoint = torch.load('aiza_model.pt', map_location='cpu', mmap=True, weights_only=True)
+    model.load_state_dict(checkpoint['model_state_dict'])
+    
+    # Quantize Linear weights once, so the server never re-quantizes at boot
+    model = quantize_int8(model)
+    torch.save({'model_state_dict': model.state_dict()}, 'aiza_model.int8.pt')
+    
+    before = os.path.getsize('aiza_model.pt') / 1e6
+    after = os.path.getsize('aiza_model.int8.pt') / 1e6
+    print(f"Saved aiza_model.int8.pt ({before:.1f} MB -> {after:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,45 @@
 """
 Train Aiza tokenizer
 """
+import argparse
+import time
 from aiza.tokenizer import AizaTokenizer
 from aiza.data import load_finance_data
 
 
+def benchmark(tokenizer, texts):
+    """Report encode/decode throughput over the corpus and peak memory"""
+    # Unix-only, so imported just for the benchmark
+    import resource
+    
+    num_bytes = sum(len(text.encode('utf-8')) for text in texts)
+    # ru_maxrss is the process-wide peak (including training), in kilobytes on Linux
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    
+    # Time the batch encoder FinanceDataset uses
+    start = time.perf_counter()
+    ids, lengths = tokenizer.encode_batch(texts)
+    encode_time = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    
+    rows = [row[:length].tolist() for row, length in zip(ids, lengths)]
+    start = time.perf_counter()
+    for row in rows:
+        tokenizer.decode(row)
+    decode_time = time.perf_counter() - start
+    
+    print(f"\nBenchmark ({len(texts)} docs, {num_bytes / 1e6:.2f} MB, {int(lengths.sum())} tokens):")
+    print(f"Encode: {len(texts) / encode_time:.0f} docs/s, {num_bytes / 1e6 / encode_time:.2f} MB/s")
+    print(f"Decode: {len(texts) / decode_time:.0f} docs/s, {num_bytes / 1e6 / decode_time:.2f} MB/s")
+    print(f"Peak RSS: {rss_before:.1f} MB before encode, {rss_after:.1f} MB after")
+
+
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--bench', action='store_true',
+                        help='benchmark encode/decode over the training corpus')
+    args = parser.parse_args()
+    
     # Load training data
     texts = load_finance_data()
     
@@ -25,6 +59,9 @@ def main():
     print(f"Original: {test_text}")
     print(f"Encoded: {encoded}")
     print(f"Decoded: {decoded}")
+    
+    if args.bench:
+        benchmark(tokenizer, texts)
 
 
 if __name__ == '__main__':